@@ -0,0 +1,11 @@
+from .ab_join import ab_join, match_patterns
+from .datasets import DATASETS, load
+from .drawing import InteractiveDrawing
+from .matrix_profile import StreamingProfile, mass, matrix_profile
+from .plotting import InteractivePlot, multi_plot_with_window, multi_plot_with_zoom
+from .ratings import ModelSelection, PairingComparison, PatternSelector
+from .recording import Recording
+from .search import QueryIndex
+from .segmentation import segment
+from .sketches import SketchStore
+from .snippets import SnippetFinder, label_boundaries, snippets
@@ -0,0 +1,192 @@
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .matrix_profile import _inverse_norm, mass, sliding_dot_product, sliding_mean_std
+
+# arrays a worker reads, attached from shared memory by _attach
+_shared = {}
+_blocks = []
+
+# match_patterns only starts processes for at least this many pattern-signal
+# samples; below it, start-up and the round trip cost more than the MASS calls
+# (3 patterns over ABP: 22 ms serially, 63 ms on three processes)
+PARALLEL_WORK = 1 << 24
+
+
+def _prepare(A, B, m):
+    # everything the diagonal kernel reads, computed once in the parent
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    A = A - A.mean()
+    B = B - B.mean()
+    arrays = {}
+    for name, T in (('a', A), ('b', B)):
+        L = len(T) - m + 1
+        if m < 2 or L < 1:
+            raise ValueError(f"subsequence length {m} does not fit a signal of {len(T)} samples")
+        mu, sigma = sliding_mean_std(T, m)
+        arrays['inv_' + name] = _inverse_norm(sigma, m)
+        # per-step covariance updates, as in matrix_profile
+        arrays['df_' + name] = np.concatenate(([0.0], (T[m:] - T[:L - 1]) / 2))
+        arrays['dg_' + name] = np.concatenate(([0.0], (T[m:] - mu[1:]) + (T[:L - 1] - mu[:L - 1])))
+        arrays['mu_' + name] = mu
+    # covariance (times m) at the start of every diagonal: A_0 against each B_k,
+    # and each A_k against B_0
+    arrays['cov_a0'] = sliding_dot_product(A[:m] - arrays['mu_a'][0], B)
+    arrays['cov_b0'] = sliding_dot_product(B[:m] - arrays['mu_b'][0], A)
+    return arrays
+
+
+def _diagonals(arrays, k0, k1):
+    # walk diagonals k0 <= k < k1, where diagonal k pairs A_i with B_(i+k); the
+    # best correlation seen for every subsequence of A and of B is kept, ties
+    # going to the lowest diagonal
+    inv_a, df_a, dg_a = arrays['inv_a'], arrays['df_a'], arrays['dg_a']
+    inv_b, df_b, dg_b = arrays['inv_b'], arrays['df_b'], arrays['dg_b']
+    La, Lb = len(inv_a), len(inv_b)
+
+    # the neighbour is stored as a diagonal offset while walking and turned into
+    # an index at the end, which saves an index array per diagonal
+    rho_a = np.full(La, -np.inf)
+    off_a = np.zeros(La, dtype=np.int64)
+    rho_b = np.full(Lb, -np.inf)
+    off_b = np.zeros(Lb, dtype=np.int64)
+    cov_buf = np.empty(min(La, Lb))
+    tmp_buf = np.empty(min(La, Lb))
+    better_buf = np.empty(min(La, Lb), dtype=bool)
+
+    for k in range(k0, k1):
+        # first pair on the diagonal
+        i0, j0 = (0, k) if k >= 0 else (-k, 0)
+        length = min(La - i0, Lb - j0)
+        cov = cov_buf[:length]
+        tmp = tmp_buf[:length - 1]
+        better = better_buf[:length]
+        a, b = slice(i0, i0 + length), slice(j0, j0 + length)
+        a1, b1 = slice(i0 + 1, i0 + length), slice(j0 + 1, j0 + length)
+
+        np.multiply(df_a[a1], dg_b[b1], out=cov[1:])
+        np.multiply(df_b[b1], dg_a[a1], out=tmp)
+        cov[1:] += tmp
+        cov[0] = arrays['cov_a0'][k] if k >= 0 else arrays['cov_b0'][-k]
+        np.cumsum(cov, out=cov)
+        cov *= inv_a[a]
+        cov *= inv_b[b]
+
+        np.greater(cov, rho_a[a], out=better)
+        np.copyto(rho_a[a], cov, where=better)
+        np.copyto(off_a[a], k, where=better)
+        np.greater(cov, rho_b[b], out=better)
+        np.copyto(rho_b[b], cov, where=better)
+        np.copyto(off_b[b], -k, where=better)
+
+    idx_a = np.where(np.isfinite(rho_a), np.arange(La) + off_a, -1)
+    idx_b = np.where(np.isfinite(rho_b), np.arange(Lb) + off_b, -1)
+    return rho_a, idx_a, rho_b, idx_b
+
+
+def _merge(total, part):
+    # element-wise min of the distance, i.e. max of the correlation; parts are
+    # merged in diagonal order, so ties resolve as in a single pass
+    for rho, idx, new_rho, new_idx in ((total[0], total[1], part[0], part[1]),
+                                       (total[2], total[3], part[2], part[3])):
+        better = new_rho > rho
+        rho[better] = new_rho[better]
+        idx[better] = new_idx[better]
+
+
+def _chunks(La, Lb, n_chunks):
+    # split the diagonals -(La - 1) .. Lb - 1 into runs of roughly equal work,
+    # the work of a diagonal being its length
+    k = np.arange(-(La - 1), Lb)
+    work = np.cumsum(np.minimum(La - np.maximum(-k, 0), Lb - np.maximum(k, 0)))
+    cuts = np.searchsorted(work, work[-1] * np.arange(1, n_chunks) / n_chunks)
+    bounds = np.unique(np.concatenate(([0], cuts, [len(k)])))
+    return [(int(k[s]), int(k[e - 1]) + 1) for s, e in zip(bounds[:-1], bounds[1:])]
+
+
+def _attach(specs):
+    for name, (block, shape, dtype) in specs.items():
+        # pool workers share the parent's resource tracker, which already holds
+        # the block and unlinks it once when the parent is done
+        shm = shared_memory.SharedMemory(name=block)
+        _blocks.append(shm)
+        _shared[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _work(bounds):
+    return _diagonals(_shared, *bounds)
+
+
+def _match(pattern):
+    return mass(pattern, _shared['signal'])
+
+
+@contextlib.contextmanager
+def _pool(arrays, n_jobs):
+    # a process pool whose workers find arrays in _shared; the arrays are placed
+    # in shared memory once, so workers read them without a copy each
+    blocks = []
+    specs = {}
+    try:
+        for name, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            specs[name] = (shm.name, array.shape, array.dtype.str)
+        with ProcessPoolExecutor(n_jobs, initializer=_attach, initargs=(specs,)) as pool:
+            yield pool
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def ab_join(A, B, m, n_jobs=None):
+    # z-normalized AB-join for subsequence length m: for every subsequence of A
+    # the distance to and index of its nearest neighbour in B, and the same for
+    # every subsequence of B in A
+    #
+    # the diagonals of the distance matrix are split across n_jobs processes
+    # (all cores by default); the precomputed signals are placed in shared
+    # memory once, so workers read them without a copy each
+    arrays = _prepare(A, B, m)
+    La, Lb = len(arrays['inv_a']), len(arrays['inv_b'])
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    if n_jobs == 1:
+        result = _diagonals(arrays, -(La - 1), Lb)
+    else:
+        # a few chunks per worker keeps them busy when chunks finish unevenly
+        with _pool(arrays, n_jobs) as pool:
+            parts = pool.map(_work, _chunks(La, Lb, 4 * n_jobs))
+            result = next(parts)
+            for part in parts:
+                _merge(result, part)
+
+    rho_a, idx_a, rho_b, idx_b = result
+    P_a = np.sqrt(np.maximum(2.0 * m * (1.0 - rho_a), 0.0))
+    P_b = np.sqrt(np.maximum(2.0 * m * (1.0 - rho_b), 0.0))
+    return P_a, idx_a, P_b, idx_b
+
+
+def match_patterns(patterns, signal, n_jobs=None):
+    # distance profile of every pattern (a drawn sketch or a discovered motif)
+    # over the signal: entry j is the z-normalized distance from the pattern to
+    # the subsequence of the signal starting at j
+    #
+    # a single pattern is one MASS convolution, far cheaper than a join walking
+    # one-element diagonals; patterns are matched in this process unless there
+    # are PARALLEL_WORK samples of work or more, which are split across up to
+    # n_jobs processes (all cores by default) reading the signal from shared memory
+    patterns = [np.asarray(pattern, dtype=np.float64) for pattern in patterns]
+    signal = np.asarray(signal, dtype=np.float64)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(patterns))
+    if n_jobs <= 1 or len(patterns) * len(signal) < PARALLEL_WORK:
+        return [mass(pattern, signal) for pattern in patterns]
+    with _pool(dict(signal=signal), n_jobs) as pool:
+        return list(pool.map(_match, patterns, chunksize=-(-len(patterns) // (4 * n_jobs))))
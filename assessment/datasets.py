@@ -0,0 +1,61 @@
+import json
+import os
+
+import numpy as np
+
+# the signals used in the study, one float per line
+DATASETS = {
+    'abp': 'TiltABP_210_2500_630.txt',
+    'heart': 'heartsignals.txt',
+    'syn1': 'syn1.txt',
+    'synthetic_no_noise': 'synthetic_no_noise.txt',
+    'synthetic_10_noise': 'synthetic_10_noise.txt',
+    'synthetic_30_noise': 'synthetic_30_noise.txt',
+}
+
+# the data files live at the top of the repository, next to this package
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(DATA_DIR, '.signal_cache')
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def load_signal(path, cache_dir=CACHE_DIR):
+    # parse the text file once and keep a sidecar .npy next to a small stamp of
+    # the source size and mtime; later loads memory-map the cached array
+    name = os.path.basename(path)
+    cache = os.path.join(cache_dir, name + '.npy')
+    meta = os.path.join(cache_dir, name + '.json')
+    stamp = _stamp(path)
+
+    try:
+        with open(meta) as f:
+            if json.load(f) == stamp:
+                return np.load(cache, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
+    signal = np.loadtxt(path, dtype=np.float64, ndmin=1)
+
+    # write to temporary names first so a reader never sees a partial cache
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{cache}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, signal)
+    os.replace(tmp, cache)
+    tmp = f'{meta}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(stamp, f)
+    os.replace(tmp, meta)
+
+    return np.load(cache, mmap_mode='r')
+
+
+def load(name, cache_dir=CACHE_DIR):
+    # load one of the named study datasets, e.g. load('abp')
+    if name not in DATASETS:
+        raise KeyError(f"unknown dataset {name!r}, expected one of {sorted(DATASETS)}")
+    return load_signal(os.path.join(DATA_DIR, DATASETS[name]), cache_dir=cache_dir)
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+def minmax_envelope(x, y, n_bins):
+    # reduce (x, y) to the minimum and maximum sample of each of n_bins
+    # equal-count bins, keeping them in their original order so spikes
+    # survive and the line still reads left to right
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_bins + 2:
+        return x, y
+
+    bin_size = -(-n // n_bins)
+    pad = bin_size * n_bins - n
+    # padding with the last sample means a padded slot can only win a tie,
+    # and clipping its index back to n - 1 picks the same value
+    bins = np.pad(y, (0, pad), mode='edge').reshape(n_bins, bin_size)
+    offsets = np.arange(n_bins) * bin_size
+    i_min = np.minimum(bins.argmin(axis=1) + offsets, n - 1)
+    i_max = np.minimum(bins.argmax(axis=1) + offsets, n - 1)
+
+    # always keep the end points so the x extent is unchanged
+    idx = np.unique(np.concatenate(([0], i_min, i_max, [n - 1])))
+    return x[idx], y[idx]
+
+
+class MinMaxPyramid:
+    # level k holds the positions of the minimum and maximum sample of every
+    # bin of 2**k samples; built once in O(n) so that any visible range can be
+    # re-sliced at a matching level of detail without touching the raw signal
+    def __init__(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+
+        dtype = np.int32 if len(self.y) < 2**31 else np.int64
+        i_min = i_max = np.arange(len(self.y), dtype=dtype)
+        # level 0 is the raw signal itself, so it is not stored
+        self.levels = [None]
+        while len(i_min) > 1:
+            if len(i_min) % 2:
+                i_min = np.append(i_min, i_min[-1])
+                i_max = np.append(i_max, i_max[-1])
+            a, b = i_min[0::2], i_min[1::2]
+            i_min = np.where(self.y[a] <= self.y[b], a, b)
+            a, b = i_max[0::2], i_max[1::2]
+            i_max = np.where(self.y[a] >= self.y[b], a, b)
+            self.levels.append((i_min, i_max))
+
+    def level(self, count, n_points):
+        # finest level at which count samples fall into at most n_points bins
+        if count <= 2 * n_points:
+            return 0
+        return min(int(np.ceil(np.log2(count / n_points))), len(self.levels) - 1)
+
+    def window(self, start, end, n_points):
+        # samples covering [start, end], reduced to about 2 * n_points points
+        n = len(self.y)
+        if n == 0 or end < self.x[0] or start > self.x[-1]:
+            return self.x[:0], self.y[:0]
+
+        # search with the bounds cast to the dtype of x, otherwise numpy converts
+        # the whole of x for every lookup
+        start = self.x.dtype.type(max(start, self.x[0]))
+        end = self.x.dtype.type(min(end, self.x[-1]))
+        i0 = max(int(np.searchsorted(self.x, start, side='left')) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, end, side='right')) + 1, n)
+
+        level = self.level(i1 - i0, n_points)
+        if level == 0:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        i_min, i_max = self.levels[level]
+        b0, b1 = i0 >> level, ((i1 - 1) >> level) + 1
+        idx = np.unique(np.concatenate(([i0], i_min[b0:b1], i_max[b0:b1], [i1 - 1])))
+        return self.x[idx], self.y[idx]
+
+
+class MinMaxIndex:
+    # sparse table over the minima and maxima of fixed-size blocks of the signal,
+    # so the y extent of any x range is found with a binary search and two
+    # lookups; ranges are widened to whole blocks, so the extent never clips
+    def __init__(self, x, y, max_blocks=1024):
+        x = np.asarray(x)
+        y = np.asarray(y)
+        n = len(y)
+        self.block = max(1, -(-n // max_blocks))
+        n_blocks = -(-n // self.block)
+
+        blocks = np.pad(y, (0, n_blocks * self.block - n), mode='edge').reshape(n_blocks, self.block)
+        self.edges = x[::self.block]
+        self.lo = [blocks.min(axis=1)]
+        self.hi = [blocks.max(axis=1)]
+        width = 1
+        while 2 * width <= n_blocks:
+            lo, hi = self.lo[-1], self.hi[-1]
+            # level k covers 2**k blocks; the tail that would run past the end is
+            # padded so every level keeps one column per block
+            self.lo.append(np.pad(np.minimum(lo[:-width], lo[width:]), (0, width), mode='edge'))
+            self.hi.append(np.pad(np.maximum(hi[:-width], hi[width:]), (0, width), mode='edge'))
+            width *= 2
+
+    def query(self, start, end):
+        i = max(int(np.searchsorted(self.edges, start, side='right')) - 1, 0)
+        j = max(int(np.searchsorted(self.edges, end, side='right')) - 1, i)
+        k = (j - i + 1).bit_length() - 1
+        return (min(self.lo[k][i], self.lo[k][j - 2**k + 1]),
+                max(self.hi[k][i], self.hi[k][j - 2**k + 1]))
+
+    def data(self):
+        # columns for a ColumnDataSource, so the same lookup can run in the browser:
+        # only the block minima and maxima, from which the browser builds the other
+        # levels; float32 halves them, rounded outward so the extent never clips
+        lo = self.lo[0].astype(np.float32)
+        hi = self.hi[0].astype(np.float32)
+        lo = np.where(lo > self.lo[0], np.nextafter(lo, np.float32(-np.inf)), lo)
+        hi = np.where(hi < self.hi[0], np.nextafter(hi, np.float32(np.inf)), hi)
+        return dict(edges=self.edges, lo=lo, hi=hi)
+
@@ -0,0 +1,91 @@
+from functools import partial
+
+from .notebook_output import show
+
+# InteractiveDrawing options of each study condition
+VARIANTS = {
+    'utils': dict(),
+    'utils_lib': dict(),
+    'utils_lib2': dict(),
+    'utils_lib3': dict(),
+    'utils_lib4': dict(dashed_grid=True, tap_to_clear=True),
+    'utils_lib5': dict(dashed_grid=True, tap_to_clear=True),
+    'utils_lib6': dict(dashed_grid=True, tap_to_clear=True),
+}
+
+
+class InteractiveDrawing:
+    # with a SketchStore, each finished stroke is sent back to Python as one pair
+    # of float arrays and added to the store with the participant and panel; this
+    # is a Python callback, so it needs the plots served as a Bokeh app
+    def __init__(self, num_plots, dashed_grid=False, tap_to_clear=False, store=None, participant=None):
+        self.num_plots = num_plots
+        self.dashed_grid = dashed_grid
+        self.tap_to_clear = tap_to_clear
+        self.store = store
+        self.participant = participant
+        self.plots = []
+        self.grid = None
+
+    def create_plot(self):
+        from bokeh.plotting import figure
+        from bokeh.models import CustomJS, ColumnDataSource, FreehandDrawTool
+        from bokeh.layouts import gridplot
+
+        for panel in range(self.num_plots):
+            source = ColumnDataSource({
+                'x': [], 'y': []
+            })
+
+            p = figure(x_range=(0, 10), y_range=(0, 10), width=400, height=400,
+                       title='Draw on the plot',
+                       tools='')
+
+            if self.dashed_grid:
+                # Change grid line color and dash
+                p.xgrid.grid_line_color = "lightgray"
+                p.ygrid.grid_line_color = "lightgray"
+                p.xgrid.grid_line_dash = [4, 4]
+                p.ygrid.grid_line_dash = [4, 4]
+
+            renderer = p.multi_line('x', 'y', source=source)
+
+            draw_tool = FreehandDrawTool(renderers=[renderer], num_objects=3)
+            p.add_tools(draw_tool)
+            p.toolbar.active_drag = draw_tool
+
+            if self.tap_to_clear:
+                # Add tap tool for clearing the data
+                clear_source_code = """
+                source.data = {'x': [], 'y': []};
+                """
+                clear_source_callback = CustomJS(args=dict(source=source), code=clear_source_code)
+                p.js_on_event('tap', clear_source_callback)
+
+            if self.store is not None:
+                # copy the stroke just finished into a source of its own, so only
+                # that stroke travels to Python, as typed arrays
+                sync = ColumnDataSource({'x': [], 'y': []})
+                p.js_on_event('panend', CustomJS(args=dict(source=source, sync=sync), code="""
+                    const xs = source.data['x'];
+                    const ys = source.data['y'];
+                    if (xs.length) {
+                        sync.data = {x: new Float64Array(xs[xs.length - 1]),
+                                     y: new Float64Array(ys[ys.length - 1])};
+                    }
+                """))
+                sync.on_change('data', partial(self.on_stroke, panel))
+
+            self.plots.append(p)
+
+        self.grid = gridplot(self.plots, ncols=2)
+
+    def on_stroke(self, panel, attr, old, new):
+        if len(new['x']) > 1:
+            self.store.add(new['x'], new['y'], participant=self.participant, panel=panel)
+
+    def show_plot(self):
+        if self.grid is not None:
+            show(self.grid)
+        else:
+            print("No plots to show. Please create a plot first.")
@@ -0,0 +1,187 @@
+# renders study pages to standalone HTML (and PNG, where Bokeh can drive a
+# headless browser) from a manifest, one process per core; an artifact is only
+# rebuilt when the hash of its inputs changes
+#
+#   python -m assessment.export manifest.json [--out DIR] [--formats html,png] [--jobs N]
+#
+# the manifest is a JSON list of entries such as
+#
+#   {"dataset": "abp", "view": "zoom", "variant": "utils_lib2", "args": {"window": [0, 5000]}}
+#
+# where view is one of VIEWS, variant names a study condition (its options can
+# be extended with "options") and args are passed to the view; "name" sets the
+# file name, which otherwise follows from the entry, with a short hash of its
+# args and options when it has any
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .datasets import load
+from .sources import digest
+
+VIEWS = ('zoom', 'window', 'patterns', 'matrix_profile', 'drawing')
+
+# the index of rendered artifacts and the hashes they were rendered from
+INDEX = 'index.json'
+
+
+def _name(entry):
+    if 'name' in entry:
+        return entry['name']
+    parts = [str(entry[key]) for key in ('dataset', 'view', 'variant') if key in entry]
+    # entries that differ only in args or options get files of their own
+    extra = {key: entry[key] for key in ('args', 'options') if entry.get(key)}
+    if extra:
+        parts.append(hashlib.blake2b(json.dumps(extra, sort_keys=True).encode(), digest_size=4).hexdigest())
+    return '_'.join(parts)
+
+
+def _code_hash():
+    # the package source, so a change to how views are drawn re-renders them
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def input_hash(entry, code_hash):
+    import bokeh
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(entry, sort_keys=True).encode())
+    h.update(code_hash.encode())
+    h.update(bokeh.__version__.encode())
+    if 'dataset' in entry:
+        h.update(digest(dict(y=np.asarray(load(entry['dataset'])))).encode())
+    return h.hexdigest()
+
+
+def build(entry):
+    # the Bokeh layout an entry describes
+    from . import drawing, plotting
+
+    view = entry['view']
+    variant = entry.get('variant', 'utils')
+    args = entry.get('args', {})
+    if view not in VIEWS:
+        raise ValueError(f"unknown view {view!r}, expected one of {VIEWS}")
+
+    if view == 'drawing':
+        plot = drawing.InteractiveDrawing(**{**drawing.VARIANTS[variant], **args})
+        plot.create_plot()
+        return plot.grid
+
+    signal = load(entry['dataset'])
+    options = {**plotting.VARIANTS[variant], **entry.get('options', {})}
+    plot = plotting.InteractivePlot(np.arange(len(signal)), signal, **options)
+    if view == 'zoom':
+        return plot.plot_with_zoom(**args)
+    if view == 'window':
+        return plot.plot_with_window(**args)
+    if view == 'patterns':
+        return plot.plot_with_patterns(**args, show_layout=False)
+    return plot.plot_with_matrix_profile(**args)
+
+
+def _write(path, text):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def render(entry, out, formats):
+    # write the artifacts of one entry; returns the file written for each format
+    # and the error of each that could not be (PNG needs selenium and a web driver)
+    from bokeh.embed import file_html
+    from bokeh.io import export_png
+    from bokeh.resources import CDN
+
+    name = _name(entry)
+    layout = build(entry)
+    files, errors = {}, {}
+    if 'html' in formats:
+        path = os.path.join(out, name + '.html')
+        _write(path, file_html(layout, CDN, title=name))
+        files['html'] = path
+    if 'png' in formats:
+        path = os.path.join(out, name + '.png')
+        try:
+            export_png(layout, filename=path)
+            files['png'] = path
+        except Exception as e:
+            errors['png'] = f'{type(e).__name__}: {e}'
+    return files, errors
+
+
+def export(manifest, out, formats=('html', 'png'), n_jobs=None):
+    # render every artifact whose inputs changed since the last export into out;
+    # hashes are kept per format, so an entry whose PNG failed only retries that
+    os.makedirs(out, exist_ok=True)
+    index_path = os.path.join(out, INDEX)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    code_hash = _code_hash()
+    todo, names = [], set()
+    for entry in manifest:
+        name = _name(entry)
+        if name in names:
+            raise ValueError(f"two manifest entries are named {name!r}")
+        names.add(name)
+        key = input_hash(entry, code_hash)
+        done = index.get(name, {}).get('formats', {})
+        missing = [fmt for fmt in formats if done.get(fmt, {}).get('hash') != key
+                   or not os.path.exists(os.path.join(out, f'{name}.{fmt}'))]
+        if missing:
+            todo.append((name, key, entry, missing))
+
+    rendered = []
+    with ProcessPoolExecutor(n_jobs or os.cpu_count() or 1) as pool:
+        futures = [(name, key, pool.submit(render, entry, out, tuple(missing)))
+                   for name, key, entry, missing in todo]
+        for name, key, future in futures:
+            # an entry that fails is recorded and retried next time, without
+            # holding back the others; so is a format that failed
+            try:
+                files, errors = future.result()
+            except Exception as e:
+                files, errors = {}, dict(render=f'{type(e).__name__}: {e}')
+            done = {fmt: artifact for fmt, artifact in index.get(name, {}).get('formats', {}).items()
+                    if fmt not in errors}
+            done.update({fmt: dict(hash=key, file=path) for fmt, path in files.items()})
+            index[name] = dict(formats=done, errors=errors)
+            if files:
+                rendered.append(name)
+            for fmt, error in errors.items():
+                print(f'{name}.{fmt}: {error}')
+
+    _write(index_path, json.dumps(index, indent=1, sort_keys=True))
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('manifest')
+    parser.add_argument('--out', default='exports')
+    parser.add_argument('--formats', default='html,png')
+    parser.add_argument('--jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    rendered = export(manifest, args.out, args.formats.split(','), args.jobs)
+    print(f'rendered {len(rendered)} of {len(manifest)} pages into {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+import numpy as np
+
+
+def sliding_mean_std(T, m):
+    # mean and standard deviation of every length-m subsequence in O(n) from
+    # running sums; T should already be centred to keep the sums well conditioned
+    c = np.concatenate(([0.0], np.cumsum(T)))
+    c2 = np.concatenate(([0.0], np.cumsum(T * T)))
+    mu = (c[m:] - c[:-m]) / m
+    var = (c2[m:] - c2[:-m]) / m - mu * mu
+    return mu, np.sqrt(np.maximum(var, 0.0))
+
+
+def sliding_dot_product(Q, T):
+    # dot product of Q with every subsequence of T, via one FFT convolution
+    m, n = len(Q), len(T)
+    size = 1 << int(np.ceil(np.log2(n + m)))
+    qt = np.fft.irfft(np.fft.rfft(T, size) * np.fft.rfft(Q[::-1], size), size)
+    return qt[m - 1:n]
+
+
+def _inverse_norm(sigma, m):
+    # 1 / (sqrt(m) * sigma), with constant subsequences mapped to 0 so that they
+    # correlate with nothing rather than producing nan
+    inv = np.zeros_like(sigma)
+    np.divide(1.0, sigma * np.sqrt(m), out=inv, where=sigma > 0)
+    return inv
+
+
+def mass(Q, T):
+    # z-normalized Euclidean distance from Q to every subsequence of T (MASS)
+    Q = np.asarray(Q, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    m = len(Q)
+    T = T - T.mean()
+    Q = Q - Q.mean()
+
+    mu, sigma = sliding_mean_std(T, m)
+    q_norm = np.sqrt(m) * Q.std()
+    if q_norm == 0:
+        return np.full(len(mu), np.sqrt(2.0 * m))
+    # Q is centred, so the dot product is already the covariance times m
+    rho = sliding_dot_product(Q, T) * _inverse_norm(sigma, m) / q_norm
+    return np.sqrt(np.maximum(2.0 * m * (1.0 - rho), 0.0))
+
+
+def matrix_profile(T, m, exclusion=None):
+    # z-normalized self-join matrix profile and profile index of T for
+    # subsequence length m
+    #
+    # diagonals of the distance matrix are walked one at a time: along a diagonal
+    # the covariance of consecutive subsequence pairs is a running sum of O(1)
+    # updates, so each diagonal is a few vectorized passes and the whole profile
+    # costs O(n^2) arithmetic with O(n) memory; the correlation is tracked
+    # instead of the distance and converted once at the end
+    T = np.asarray(T, dtype=np.float64)
+    T = T - T.mean()
+    n = len(T)
+    L = n - m + 1
+    if m < 2 or L < 2:
+        raise ValueError(f"subsequence length {m} does not fit a signal of {n} samples")
+    if exclusion is None:
+        exclusion = int(np.ceil(m / 4))
+
+    mu, sigma = sliding_mean_std(T, m)
+    inv = _inverse_norm(sigma, m)
+
+    # per-step covariance updates (SCAMP): moving a pair of windows one sample to
+    # the right adds df[i] * dg[j] + df[j] * dg[i]
+    df = np.concatenate(([0.0], (T[m:] - T[:L - 1]) / 2))
+    dg = np.concatenate(([0.0], (T[m:] - mu[1:]) + (T[:L - 1] - mu[:L - 1])))
+    # covariance (times m) of the first subsequence with every other one
+    cov0 = sliding_dot_product(T[:m] - mu[0], T)
+
+    rho_max = np.full(L, -np.inf)
+    offset = np.zeros(L, dtype=np.int64)
+    cov_buf = np.empty(L)
+    tmp_buf = np.empty(L)
+    better_buf = np.empty(L, dtype=bool)
+
+    for k in range(exclusion + 1, L):
+        length = L - k
+        cov = cov_buf[:length]
+        step = cov_buf[1:length]
+        tmp = tmp_buf[:length - 1]
+        better = better_buf[:length]
+
+        np.multiply(df[1:length], dg[k + 1:], out=step)
+        np.multiply(df[k + 1:], dg[1:length], out=tmp)
+        step += tmp
+        cov[0] = cov0[k]
+        np.cumsum(cov, out=cov)
+
+        # correlation, then update the profile of both the row and the column
+        cov *= inv[:length]
+        cov *= inv[k:]
+        np.greater(cov, rho_max[:length], out=better)
+        np.copyto(rho_max[:length], cov, where=better)
+        np.copyto(offset[:length], k, where=better)
+        np.greater(cov, rho_max[k:], out=better)
+        np.copyto(rho_max[k:], cov, where=better)
+        np.copyto(offset[k:], -k, where=better)
+
+    P = np.sqrt(np.maximum(2.0 * m * (1.0 - rho_max), 0.0))
+    I = np.where(np.isfinite(rho_max), np.arange(L) + offset, -1)
+    return P, I
+
+
+class StreamingProfile:
+    # self-join matrix profile kept up to date as samples are appended (STAMPI):
+    # each new subsequence gets its distance profile against all earlier ones in
+    # O(n) from the previous one's dot products, which also lowers the profile of
+    # every earlier subsequence it is closer to
+    #
+    # with a source attached, each append streams the new profile entries and
+    # patches only the runs of older entries that changed, instead of re-sending
+    # the whole profile
+    def __init__(self, T, m, exclusion=None, source=None):
+        T = np.asarray(T, dtype=np.float64)
+        self.m = m
+        self.exclusion = int(np.ceil(m / 4)) if exclusion is None else exclusion
+        self.source = source
+        P, I = matrix_profile(T, m, self.exclusion)
+
+        # the signal stays centred on the mean of the initial samples
+        self.offset = T.mean()
+        T = T - self.offset
+        mu, sigma = sliding_mean_std(T, m)
+        self.n, self.L = len(T), len(mu)
+
+        # buffers grow by doubling, so appends are amortized O(1) in memory; all
+        # of them hold as many entries as the signal buffer
+        self._T = np.empty(2 * self.n)
+        self._mu = np.empty(2 * self.n)
+        self._inv = np.empty(2 * self.n)
+        self._qt = np.empty(2 * self.n)
+        self._rho = np.empty(2 * self.n)
+        self._I = np.empty(2 * self.n, dtype=np.int64)
+        self._T[:self.n] = T
+        self._mu[:self.L] = mu
+        self._inv[:self.L] = _inverse_norm(sigma, m)
+        self._rho[:self.L] = 1.0 - P * P / (2.0 * m)
+        self._I[:self.L] = I
+        self._refresh()
+
+    @property
+    def P(self):
+        return np.sqrt(np.maximum(2.0 * self.m * (1.0 - self._rho[:self.L]), 0.0))
+
+    @property
+    def I(self):
+        return self._I[:self.L]
+
+    def _refresh(self):
+        # exact dot products of the last subsequence with every subsequence; the
+        # running update is re-anchored here so rounding cannot build up
+        T = self._T[:self.n]
+        self._qt[:self.L] = sliding_dot_product(T[self.L - 1:], T)
+
+    def _reserve(self, n):
+        if n <= len(self._T):
+            return
+        size = max(2 * len(self._T), n)
+        for name in ('_T', '_mu', '_inv', '_qt', '_rho', '_I'):
+            old = getattr(self, name)
+            new = np.empty(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _step(self, value):
+        # add one sample, i.e. subsequence i, and return the earlier subsequences
+        # whose nearest neighbour it became
+        m, T = self.m, self._T
+        T[self.n] = value - self.offset
+        self.n += 1
+        i = self.L
+        self.L += 1
+        window = T[i:self.n]
+
+        # dot products with subsequence i from those with subsequence i - 1
+        qt = self._qt
+        qt[1:self.L] = qt[:i] - T[:i] * T[i - 1] + T[m:self.n] * T[self.n - 1]
+        qt[0] = np.dot(T[:m], window)
+
+        mu = window.mean()
+        self._mu[i] = mu
+        self._inv[i] = _inverse_norm(np.array([window.std()]), m)[0]
+
+        # only subsequences outside the exclusion zone are neighbours
+        valid = max(i - self.exclusion, 0)
+        rho = (qt[:valid] - m * mu * self._mu[:valid]) * self._inv[:valid] * self._inv[i]
+        if valid:
+            best = int(np.argmax(rho))
+            self._rho[i], self._I[i] = rho[best], best
+        else:
+            self._rho[i], self._I[i] = -np.inf, -1
+
+        better = np.flatnonzero(rho > self._rho[:valid])
+        self._rho[better] = rho[better]
+        self._I[better] = i
+        return better
+
+    def append(self, values, chunk=1024):
+        # append samples in chunks of at most chunk; each chunk re-anchors the
+        # dot products and, with a source attached, is pushed as one update
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        self._reserve(self.n + len(values))
+        for start in range(0, len(values), chunk):
+            first = self.L
+            changed = [self._step(value) for value in values[start:start + chunk]]
+            self._refresh()
+            if self.source is not None:
+                self._push(first, np.unique(np.concatenate(changed)))
+
+    def _push(self, first, changed):
+        P = self.P
+        self.source.stream(dict(x=np.arange(first, self.L), y=P[first:]))
+
+        # one patch per run of consecutive changed entries that were already sent
+        changed = changed[changed < first]
+        if len(changed):
+            breaks = np.flatnonzero(np.diff(changed) > 1) + 1
+            runs = zip(changed[np.r_[0, breaks]], changed[np.r_[breaks - 1, len(changed) - 1]] + 1)
+            self.source.patch(dict(y=[(slice(int(a), int(b)), P[a:b]) for a, b in runs]))
@@ -0,0 +1,18 @@
+# BokehJS is loaded into the notebook the first time something is actually
+# shown, rather than when a plotting module is imported, so batch scripts and
+# worker processes never pay for it
+_notebook_loaded = False
+
+
+def load_notebook():
+    global _notebook_loaded
+    if not _notebook_loaded:
+        from bokeh.io import output_notebook
+        output_notebook()
+        _notebook_loaded = True
+
+
+def show(obj, **kwargs):
+    from bokeh.io import show as bokeh_show
+    load_notebook()
+    return bokeh_show(obj, **kwargs)
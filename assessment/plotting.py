@@ -0,0 +1,544 @@
+from functools import lru_cache
+from time import perf_counter
+
+import numpy as np
+
+from .decimation import minmax_envelope, MinMaxPyramid, MinMaxIndex
+from .matrix_profile import StreamingProfile, matrix_profile
+from .notebook_output import show
+from .recording import Recording
+from .segmentation import segment
+from .sources import as_column, shared_source
+from .windows import WindowServer
+
+# figure and line styling shared by the study conditions
+STYLES = {
+    # black plot with white line and axis labels
+    'dark': dict(figure=dict(background_fill_color='black'),
+                 line=dict(line_color='white'),
+                 axis_color='white'),
+    # black plot with black axis labels, for light notebook themes
+    'light': dict(figure=dict(background_fill_color='black'),
+                  line=dict(line_color='white'),
+                  axis_color='black'),
+    # grey strip without axes; the main figure only ever shows a window of the
+    # signal, so in decimate mode it is reduced per window rather than per figure
+    'window': dict(figure=dict(toolbar_location=None, x_axis_type=None, x_axis_location="above",
+                               background_fill_color="#efefef", y_axis_location=None),
+                   line=dict(line_width=2),
+                   axis_color=None,
+                   windowed=True,
+                   pattern_sliders='column',
+                   span_colors=['red', 'green', 'blue', 'orange', 'purple', 'cyan', 'magenta']),
+}
+
+# line figures drawing more points than this use WebGL unless a backend is given;
+# None keeps canvas, as the study was run with, until a threshold is set from
+# the fps of both backends by point count (benchmarks/render_fps.py --sizes
+# --headless, where a browser is available)
+WEBGL_THRESHOLD = None
+
+# InteractivePlot options of each study condition, named after the module that
+# used to implement it
+VARIANTS = {
+    'utils': dict(),
+    'utils_lib': dict(padded_y_range=True),
+    'utils_lib2': dict(autoscale=True),
+    'utils_lib3': dict(width=300, height=100, aspect_ratio=1/2, overview_on_top=True),
+    'utils_lib4': dict(width=300, height=100, aspect_ratio=1/2, overview_on_top=True),
+    'utils_lib5': dict(style='light', ticks=True),
+    'utils_lib6': dict(style='window', width=400, height=150),
+}
+
+
+@lru_cache(maxsize=None)
+def _theme(axis_color):
+    from bokeh.themes import Theme
+
+    # theme everything for a cleaner look
+    return Theme(json={
+        "attrs": {
+            "Plot": { "toolbar_location": None },
+            "Grid": { "grid_line_color": None },
+            "Axis": {
+                "axis_line_color": None,
+                "major_label_text_color": axis_color,
+                "major_tick_line_color": axis_color,
+                "minor_tick_line_color": axis_color,
+            }
+        }
+    })
+
+
+class InteractivePlot:
+    def __init__(self, t, signal, width=600, height=300, aspect_ratio=None, style='dark',
+                 ticks=False, autoscale=False, padded_y_range=False, overview_on_top=False,
+                 decimate=False, lod=False, float32=False, backend=None, rollover=None, fps=30,
+                 serve_window=False, live=False):
+        from bokeh.plotting import figure, curdoc
+        from bokeh.models import ColumnDataSource, BasicTicker, FuncTickFormatter
+
+        # numpy columns are sent as binary buffers rather than JSON number lists
+        self.t = as_column(t)
+        self.signal = as_column(signal)
+        # x extent in one vectorized pass, shared by the ranges, sliders and lod
+        self.x_start, self.x_end = self.t.min().item(), self.t.max().item()
+        self.width = width
+        self.float32 = float32
+        self.decimate = bool(decimate or lod)
+        self.style = STYLES[style]
+        self.autoscale = autoscale
+        self.padded_y_range = padded_y_range
+        self.overview_on_top = overview_on_top
+        self.serve_window = serve_window
+        # live mode (live or a rollover): append() streams into the source, keeping
+        # at most rollover points in the browser and pushing at most fps times a second
+        self.live = bool(live or rollover is not None)
+        self.rollover = rollover
+        self.fps = fps
+        self.handle = None
+        self._pending = []
+        self._pushed_at = 0.0
+        self._flush_scheduled = False
+        self._dt = (self.t[1] - self.t[0]).item() if len(self.t) > 1 else 1
+
+        # create a data source to enable refreshing of fill; in decimate mode only
+        # the per-pixel min/max envelope is sent, so the payload follows the width
+        # (lod can also be a prebuilt pyramid, such as an out-of-core Recording,
+        # in which case t and signal need only be an overview of it)
+        self.pyramid = None
+        if lod:
+            self.pyramid = MinMaxPyramid(self.t, self.signal) if lod is True else lod
+            x, y = overview = self.pyramid.window(self.x_start, self.x_end, n_points=width)
+        elif decimate or serve_window:
+            # windowed figures show the envelope until plot_with_window refills
+            # them, with the first served window or an envelope at the
+            # resolution of the window
+            x, y = overview = minmax_envelope(self.t, self.signal, n_bins=width)
+        else:
+            x, y = overview = self.t, self.signal
+        # the sources only feed the display, so y can be halved to float32
+        if float32:
+            y = y.astype(np.float32)
+            overview = (overview[0], overview[1].astype(np.float32))
+        # the source is shared with every other figure of the same data, except in
+        # lod, window-serving and windowed decimate modes where it is re-sliced for
+        # this plot alone and in live mode where it is appended to
+        self._resliced = bool(lod or serve_window or (decimate and self.style.get('windowed')))
+        if self._resliced or self.live:
+            self.source = ColumnDataSource(data=dict(x=x, y=y))
+        else:
+            self.source = shared_source(dict(x=x, y=y))
+        # the overview keeps the full-range data while the main source is re-sliced
+        if self._resliced or overview[0] is not x:
+            self.overview_source = shared_source(dict(x=overview[0], y=overview[1]))
+        else:
+            self.overview_source = self.source
+
+        # the main figure and its overview are drawn with the same backend
+        if backend is None:
+            webgl = WEBGL_THRESHOLD is not None and len(x) > WEBGL_THRESHOLD
+            backend = 'webgl' if webgl else 'canvas'
+        self.backend = backend
+
+        # create main scatter plot, as a line (with fill)
+        sizing = dict(aspect_ratio=aspect_ratio) if aspect_ratio is not None else {}
+        self.p = figure(height=height, width=width, tools="", x_range=(self.x_start, self.x_end),
+                        output_backend=self.backend, **sizing, **self.style['figure'])
+        self._line = self.p.line('x', 'y', source=self.source, **self.style['line'])
+
+        # re-slice the source at the level of detail of the visible range; these are
+        # Python callbacks, so they only run when the layout is served as a Bokeh app;
+        # with serve_window the main figure holds served windows instead
+        if lod and not serve_window:
+            self._lod_window = (self.x_start, self.x_end, self.x_end - self.x_start)
+            self.p.x_range.on_change('start', self.update_lod)
+            self.p.x_range.on_change('end', self.update_lod)
+
+        if ticks:
+            # ticks are recomputed in the browser for the visible range, a bounded
+            # number of labelled ticks with fine minor ticks between them
+            self.p.xaxis.ticker = BasicTicker(desired_num_ticks=10, num_minor_ticks=10, min_interval=1)
+            self.p.yaxis.ticker = BasicTicker(desired_num_ticks=10)
+
+            # Customize tick labels
+            self.p.xaxis.formatter = FuncTickFormatter(code="""
+                return Math.floor(tick);
+            """)
+            self.p.yaxis.formatter = FuncTickFormatter(code="""
+                return parseFloat(tick.toFixed(2));
+            """)
+
+        if self.style['axis_color'] is not None:
+            curdoc().theme = _theme(self.style['axis_color'])
+
+    def update_lod(self, attr, old, new):
+        start, end = self.p.x_range.start, self.p.x_range.end
+        lo, hi, span = self._lod_window
+
+        # nothing to do while the view stays inside the loaded window and has not
+        # been zoomed in far enough to need a finer level
+        if lo <= start and end <= hi and end - start > span / 4:
+            return
+
+        # load the visible range plus half its width on each side, so small pans
+        # are drawn from data already in the browser
+        margin = (end - start) / 2
+        x, y = self.pyramid.window(start - margin, end + margin, n_points=2 * self.width)
+        self.source.data = dict(x=x, y=y.astype(np.float32) if self.float32 else y)
+        self._lod_window = (start - margin, end + margin, end - start + 2 * margin)
+
+    def append(self, samples, t=None):
+        # add samples to the end of the signal, at times t or continuing its sample
+        # spacing; updates are batched and pushed at most fps times a second, the
+        # last batch of a burst once the interval has passed
+        if self.decimate:
+            raise ValueError("append needs a plot built without decimate or lod")
+        if not self.live:
+            # a shared source would stream into every figure of the same signal
+            raise ValueError("append needs a plot built with live=True or a rollover")
+        samples = as_column(samples, float32=self.float32)
+        if t is None:
+            t = self.x_end + self._dt * np.arange(1, len(samples) + 1)
+        t = as_column(t)
+        if len(t) == 0:
+            return
+        self.x_end = t[-1].item()
+        self._pending.append((t, samples))
+        if perf_counter() - self._pushed_at >= 1 / self.fps:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        import asyncio
+
+        if self._flush_scheduled:
+            return
+        delay = max(1 / self.fps - (perf_counter() - self._pushed_at), 0.0)
+        doc = self.p.document
+        if self.handle is None and doc is not None and doc.session_context is not None:
+            # served: document changes must run as document callbacks
+            doc.add_timeout_callback(self._scheduled_flush, delay * 1000)
+        else:
+            # notebook: the kernel's event loop; without one, flush() is left to the caller
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            loop.call_later(delay, self._scheduled_flush)
+        self._flush_scheduled = True
+
+    def _scheduled_flush(self):
+        self._flush_scheduled = False
+        self.flush()
+
+    def flush(self):
+        from bokeh.io import push_notebook
+
+        if not self._pending:
+            return
+        x = np.concatenate([t for t, _ in self._pending])
+        y = np.concatenate([samples for _, samples in self._pending])
+        self._pending = []
+
+        # a view that showed the end of the signal keeps following it
+        x_range = self.p.x_range
+        if x_range.end >= x[0] - self._dt:
+            x_range.start, x_range.end = x[-1].item() - (x_range.end - x_range.start), x[-1].item()
+
+        # only the new points are sent; the browser drops the oldest beyond rollover
+        self.source.stream(dict(x=x, y=y), rollover=self.rollover)
+        if self.handle is not None:
+            push_notebook(handle=self.handle)
+        self._pushed_at = perf_counter()
+
+    def show(self, obj=None):
+        # show a layout built from this plot (the bare figure by default) and keep
+        # the notebook handle that append() pushes to
+        self.handle = show(self.p if obj is None else obj, notebook_handle=True)
+        return self.handle
+
+    def plot_with_patterns(self, num_patterns, show_layout=True, boundaries=None):
+        from bokeh.models import Span, CustomJS, Slider, Div
+        from bokeh.layouts import layout, column
+        from bokeh.palettes import Category10
+
+        # boundaries seed where each pattern ends: 'auto' for the regime changes
+        # found by segmentation.segment, or num_patterns - 1 sample indices; the
+        # last pattern ends with the signal. the proposed end of each pattern, in
+        # x units, is kept in self.boundaries
+        if boundaries is None:
+            self.boundaries = None
+            ends = [(0, 1)] * num_patterns
+        else:
+            if isinstance(boundaries, str) and boundaries == 'auto':
+                boundaries, _ = segment(self.signal, num_patterns)
+            idx = np.minimum(np.asarray(boundaries, dtype=np.int64), len(self.t) - 1)
+            self.boundaries = [self.t[i].item() for i in idx] + [self.x_end]
+            self.boundaries += [self.x_end] * (num_patterns - len(self.boundaries))
+            ends = [(end, end) for end in self.boundaries[:num_patterns]]
+
+        colors = self.style.get('span_colors', Category10[10])
+        sliders = []
+        for i, (location, value) in enumerate(ends):
+            # create the vertical line
+            vline = Span(location=location, dimension='height', line_color=colors[i % len(colors)], line_width=2)
+            self.p.renderers.extend([vline])
+
+            # JS callback for the slider
+            callback = CustomJS(args=dict(span=vline), code="""
+                span.location = cb_obj.value;
+            """)
+
+            # create slider
+            time_slider = Slider(start=self.x_start, end=self.x_end, value=value, step=.1, title="")
+            time_slider.js_on_change('value', callback)
+
+            # create div for label
+            div = Div(text=f"Pattern {i+1} ends here:")
+
+            # add slider and label to list
+            sliders.append(column(div, time_slider))
+
+        # the pattern sliders side by side under the figure, or stacked in one
+        # column with the figure as styles with pattern_sliders='column' have it
+        if self.style.get('pattern_sliders', 'row') == 'column':
+            plot = column(self.p, *sliders)
+        else:
+            plot = layout([[self.p], sliders])
+        if not show_layout:
+            return plot
+        self.handle = show(plot, notebook_handle=True)
+
+    def plot_with_zoom(self, window=None):
+        from bokeh.plotting import figure
+        from bokeh.models import RangeTool, CustomJS, DataRange1d
+        from bokeh.layouts import column
+
+        # start zoomed into a fixed (start, end) window of the signal
+        if window is not None:
+            self.p.x_range.start, self.p.x_range.end = window
+
+        if self.autoscale:
+            # y autoscale answered from a block min/max index of the full signal instead
+            # of a scan over every sample; start and end both fire on each drag frame,
+            # so the lookup is deferred to the next animation frame and done once
+            index = shared_source(MinMaxIndex(self.t, self.signal).data())
+            callback = CustomJS(args=dict(index=index, x_range=self.p.x_range, y_range=self.p.y_range), code="""
+                if (index._autoscale_pending) {
+                    return;
+                }
+                index._autoscale_pending = true;
+                window.requestAnimationFrame(function () {
+                    index._autoscale_pending = false;
+                    var data = index.data;
+                    var edges = data['edges'];
+
+                    // the sparse table is built from the block minima and maxima
+                    // on first use and kept on the model; level k covers 2**k blocks
+                    var table = index._minmax_table;
+                    if (table === undefined) {
+                        var n = edges.length;
+                        var los = [Float64Array.from(data['lo'])], his = [Float64Array.from(data['hi'])];
+                        for (var w = 1; 2 * w <= n; w *= 2) {
+                            var plo = los[los.length - 1], phi = his[his.length - 1];
+                            var nlo = new Float64Array(n), nhi = new Float64Array(n);
+                            for (var b = 0; b < n; b++) {
+                                var c = Math.min(b + w, n - 1);
+                                nlo[b] = Math.min(plo[b], plo[c]);
+                                nhi[b] = Math.max(phi[b], phi[c]);
+                            }
+                            los.push(nlo);
+                            his.push(nhi);
+                        }
+                        table = index._minmax_table = {lo: los, hi: his};
+                    }
+
+                    // last block starting at or before v
+                    function block(v) {
+                        var lo = 0, hi = edges.length;
+                        while (lo < hi) {
+                            var mid = (lo + hi) >>> 1;
+                            if (edges[mid] <= v) { lo = mid + 1; } else { hi = mid; }
+                        }
+                        return Math.max(lo - 1, 0);
+                    }
+
+                    var i = block(x_range.start);
+                    var j = Math.max(block(x_range.end), i);
+                    var k = 31 - Math.clz32(j - i + 1);
+                    var lo = table.lo[k], hi = table.hi[k];
+                    y_range.start = Math.min(lo[i], lo[j - (1 << k) + 1]);
+                    y_range.end = Math.max(hi[i], hi[j - (1 << k) + 1]);
+                });
+            """)
+            self.p.x_range.js_on_change('start', callback)
+            self.p.x_range.js_on_change('end', callback)
+
+        # create the range tool (smaller plot)
+        select = figure(height=100, width=600, y_range=self.p.y_range,
+                        x_axis_type=None, y_axis_type=None, output_backend=self.backend,
+                        tools="", toolbar_location=None, background_fill_color="#efefef")
+
+        range_tool = RangeTool(x_range=self.p.x_range)
+        range_tool.overlay.fill_color = "navy"
+        range_tool.overlay.fill_alpha = 0.2
+
+        select.line('x', 'y', source=self.overview_source)
+        select.ygrid.grid_line_color = None
+        select.add_tools(range_tool)
+        select.toolbar.active_multi = range_tool
+
+        # let the main plot pad its own y range instead of sharing the overview's
+        if self.padded_y_range:
+            self.p.y_range = DataRange1d(range_padding=0.1)
+
+        if self.overview_on_top:
+            return column(select, self.p)
+        return column(self.p, select)
+
+    def plot_with_matrix_profile(self, m, profile=None):
+        from bokeh.plotting import figure
+        from bokeh.models import ColumnDataSource
+        from bokeh.layouts import column
+
+        # matrix profile for subsequence length m under the main plot, sharing its
+        # x range; dips mark repeated patterns and peaks mark anomalies
+        #
+        # a StreamingProfile gets a source of its own at full resolution, indexed by
+        # subsequence, which its appends then stream into and patch
+        if isinstance(profile, StreamingProfile):
+            profile.source = source = ColumnDataSource(data=dict(x=np.arange(profile.L), y=profile.P))
+        else:
+            if profile is None:
+                profile, _ = matrix_profile(self.signal, m)
+            x, y = self.t[:len(profile)], profile
+            if self.decimate:
+                x, y = minmax_envelope(x, y, n_bins=self.width)
+            source = shared_source(dict(x=x, y=y))
+
+        mp = figure(height=100, width=self.width, x_range=self.p.x_range, output_backend=self.backend,
+                    tools="", toolbar_location=None, background_fill_color="#efefef")
+        mp.line('x', 'y', source=source, line_color='navy')
+        mp.ygrid.grid_line_color = None
+
+        return column(self.p, mp)
+
+    def highlight(self, starts, length, color='orange'):
+        from bokeh.models import BoxAnnotation
+
+        # shade matches on the main figure, e.g. the hits of QueryIndex.search,
+        # given as start indices into the signal and a length in samples
+        boxes = []
+        for i in starts:
+            end = min(int(i) + length, len(self.t)) - 1
+            box = BoxAnnotation(left=self.t[i].item(), right=self.t[end].item(), fill_color=color, fill_alpha=0.2)
+            self.p.add_layout(box)
+            boxes.append(box)
+        return boxes
+
+    def _served_window(self, left):
+        # the samples in [left, left + window_size], one beyond each side so the
+        # line reaches the edges of the figure
+        right = left + self.window_size
+        if isinstance(self.pyramid, Recording):
+            i0 = int(np.ceil((left - self.pyramid.t0) / self.pyramid.dt)) - 1
+            i1 = int(np.floor((right - self.pyramid.t0) / self.pyramid.dt)) + 2
+        else:
+            i0 = int(np.searchsorted(self.t, left, side='left')) - 1
+            i1 = int(np.searchsorted(self.t, right, side='right')) + 1
+        return self.window_server.window(i0, i1)
+
+    def update_window(self, attr, old, new):
+        x, y = self._served_window(new)
+        self.source.data = dict(x=x, y=y)
+
+    def plot_with_window(self, window_size):
+        from bokeh.plotting import figure
+        from bokeh.models import CustomJS, Slider, BoxAnnotation, CDSView
+        from bokeh.layouts import column
+
+        select = figure(height=65, width=self.width, tools="", toolbar_location=None,
+                        x_axis_type=None, y_axis_type=None, output_backend=self.backend,
+                        background_fill_color="#efefef")
+
+        if self.serve_window:
+            # the top figure holds only the current window, refilled by
+            # update_window; the overview draws a per-pixel envelope. a recording
+            # serves its samples from disk, as t and signal are only its overview
+            if isinstance(self.pyramid, Recording):
+                self.window_server = WindowServer(self.pyramid.x, self.pyramid.y,
+                                                  int(np.ceil(window_size / self.pyramid.dt)),
+                                                  float32=self.float32)
+            else:
+                self.window_server = WindowServer(self.t, self.signal, window_size, float32=self.float32)
+            self.window_size = window_size
+            self.update_window('value', None, self.x_start)
+        elif self._resliced and self.pyramid is None:
+            # the envelope at the width of the figure per window, which looks
+            # the same as the full signal wherever the window is moved
+            n_bins = int(np.ceil(self.width * (self.x_end - self.x_start) / window_size))
+            x, y = minmax_envelope(self.t, self.signal, n_bins=n_bins)
+            y = y.astype(np.float32) if self.float32 else y
+            if len(x) < len(self.t):
+                self.source.data = dict(x=x, y=y)
+            else:
+                # nothing to reduce at this window size: the full signal, shared
+                # with every other figure of it, feeds the figure and the overview
+                self.source = self.overview_source = shared_source(dict(x=x, y=y))
+                self._line.data_source = self.source
+                self._line.view = CDSView(source=self.source)
+
+        select.line('x', 'y', source=self.overview_source)
+        select.ygrid.grid_line_color = None
+
+        # Initial values for the highlight box and top plot range
+        left = self.x_start
+        self.p.x_range.start, self.p.x_range.end = left, left + window_size
+        box = BoxAnnotation(left=left, right=left + window_size, fill_color='red', fill_alpha=0.1)
+        select.add_layout(box)
+
+        # Slider
+        slider = Slider(start=left, end=self.x_end, value=left, step=1, title="Drag to change the highlighted range")
+
+        # JavaScript code to update the highlight box and top plot range
+        callback = CustomJS(args=dict(p=self.p, box=box, slider=slider, window_size=window_size), code="""
+            box.left = slider.value;
+            box.right = slider.value + window_size;
+            p.x_range.start = slider.value;
+            p.x_range.end = slider.value + window_size;
+        """)
+
+        # Execute the callback whenever the slider value changes
+        slider.js_on_change('value', callback)
+        # the range and box move in the browser at once, the samples follow from
+        # Python; like lod, this needs the layout served as a Bokeh app
+        if self.serve_window:
+            slider.on_change('value', self.update_window)
+
+        return column(self.p, select, slider)
+
+
+def _grid(plots):
+    from bokeh.layouts import layout
+
+    rows = [plots[i:i+2] for i in range(0, len(plots), 2)]
+    return layout(rows)
+
+
+def multi_plot_with_zoom(t, signals, window=None, **options):
+    plots = [InteractivePlot(t, signal, **options).plot_with_zoom(window) for signal in signals]
+    show(_grid(plots), notebook_handle=True)
+
+
+def multi_plot_with_window(signals, window, **options):
+    from bokeh.io import push_notebook
+
+    # Create an interactive plot for each signal and arrange them in rows
+    plots = [InteractivePlot(np.arange(len(signal)), signal, **options).plot_with_window(window)
+             for signal in signals]
+
+    # Display the plots
+    handle = show(_grid(plots), notebook_handle=True)
+    push_notebook(handle=handle)
@@ -0,0 +1,110 @@
+from collections import deque
+from time import perf_counter_ns
+
+from . import responses
+
+# timing events of every rating widget, oldest first, for collect_metrics; the
+# oldest are dropped if nothing collects them
+metrics = deque(maxlen=100000)
+
+
+def collect_metrics():
+    # the timing events recorded since the last call
+    events = []
+    while metrics:
+        events.append(metrics.popleft())
+    return events
+
+
+class ButtonQuestion:
+    # a question printed above a row of buttons; the last button clicked is
+    # kept in self.value and every click in self.responses, and each click is
+    # recorded in the response log (the one opened with responses.open_log
+    # unless one is given) against the stimulus the question is about
+    #
+    # perf_counter_ns timestamps are kept for when the buttons were displayed,
+    # first clicked and last clicked; time to display includes building the
+    # widgets, and the wait until the first click includes the browser drawing
+    # whatever sits above them
+    prompt = ''
+    answer = "You select: "
+    choices = []
+
+    def __init__(self, stimulus=None, log=None):
+        import ipywidgets as widgets
+        from IPython.display import display
+
+        self.created_ns = perf_counter_ns()
+        print(self.prompt)
+        self.stimulus = stimulus
+        self.log = log
+        self.value = None
+        self.responses = []
+        self.buttons = [widgets.Button(description = choice) for choice in self.choices]
+        for button in self.buttons:
+            button.on_click(self.on_button_clicked)
+        display(*self.buttons)
+        self.displayed_ns = perf_counter_ns()
+        self.first_interaction_ns = None
+        self.answered_ns = None
+        self._event('display', self.displayed_ns, display_ns=self.displayed_ns - self.created_ns)
+
+    def _event(self, name, t_ns, **fields):
+        metrics.append(dict(widget=type(self).__name__, stimulus=self.stimulus, event=name, t_ns=t_ns,
+                            since_display_ns=t_ns - self.displayed_ns, **fields))
+
+    def parse(self, description):
+        return description
+
+    def on_button_clicked(self, b):
+        now = perf_counter_ns()
+        if self.first_interaction_ns is None:
+            self.first_interaction_ns = now
+            self._event('first_interaction', now)
+        self.answered_ns = now
+
+        print(self.answer, b.description)
+        self.value = self.parse(b.description)
+        self.responses.append(self.value)
+        self._event('answer', now, value=self.value)
+        log = self.log or responses.current
+        if log is not None:
+            log.record(type(self).__name__, self.value, self.stimulus,
+                       latency_ns=now - self.displayed_ns,
+                       first_interaction_ns=self.first_interaction_ns - self.displayed_ns)
+
+
+PREFERENCE_CHOICES = ['1 - Strongly Prefer A', '2 - Prefer A', '3 - No Preference', '4 - Prefer B', '5 - Strongly Prefer B']
+
+
+class PatternSelector(ButtonQuestion):
+    prompt = 'How many different patterns do you see in the data shown above? Please indicate by clicking on the corresponding number below.'
+    answer = "Number of patterns you selected:"
+    choices = ['1', '2', '3', '4', '5']
+
+    def parse(self, description):
+        return int(description)
+
+
+class ModelSelection(ButtonQuestion):
+    prompt = 'Considering the summaries provided by the two methods, please rate your preference for each method on a scale of 1 to 5, where 1 indicates (Strongly Prefer A), 3 indicates (No Preference), and 5 indicates (Strongly Prefer B).'
+    choices = PREFERENCE_CHOICES
+
+
+class PairingComparison(ButtonQuestion):
+    prompt = 'Considering how each method pairs the discovered patterns with the ones you identified, please rate your preference for each method on a scale of 1 to 5. A score of 1 indicates (Strongly Prefer A), 3 indicates (No Preference), and 5 indicates (Strongly Prefer B).'
+    choices = PREFERENCE_CHOICES
+
+
+# wording used by the earlier and later study conditions
+class DistinctPatternSelector(PatternSelector):
+    prompt = 'How many distinct patterns you see in the given signal?'
+    answer = "Number of patterns, selected by you is: "
+
+
+class ShortModelSelection(ModelSelection):
+    prompt = 'Considering the summaries provided by the two methods, please rate your preference for each method.'
+
+
+class ShortPairingComparison(PairingComparison):
+    prompt = 'Considering how each method labaled data with corresponding patterns.'
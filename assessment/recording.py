@@ -0,0 +1,198 @@
+import contextlib
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .datasets import CACHE_DIR, _stamp
+from .decimation import minmax_envelope
+
+
+def _text_chunks(path, chunk):
+    # float arrays of about chunk bytes of a one-column text file each, split on
+    # line ends so no number is cut in two
+    rest = b''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(chunk)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind(b'\n') + 1
+            rest = block[cut:]
+            if cut:
+                yield np.array(block[:cut].split(), dtype=np.float64)
+    if rest.strip():
+        yield np.array(rest.split(), dtype=np.float64)
+
+
+def _array_chunks(path, chunk):
+    values = np.load(path, mmap_mode='r').reshape(-1)
+    step = max(chunk // values.itemsize, 1)
+    for start in range(0, len(values), step):
+        yield np.asarray(values[start:start + step], dtype=np.float64)
+
+
+class Recording:
+    # a one-column recording too large to hold in memory: one streaming pass
+    # computes summary statistics and a min/max pyramid from blocks of 2**base
+    # samples upward, and copies text samples into a raw float64 cache file (a
+    # .npy file is memory-mapped as it is); windows are served from the pyramid,
+    # reading raw samples only for ranges narrow enough to need them
+    #
+    # the result is cached per source path and reused while the source file
+    # keeps its size and mtime; x is t0 + dt * sample index
+    def __init__(self, path, t0=0, dt=1, base=6, chunk=1 << 24, cache_dir=CACHE_DIR):
+        self.t0 = t0
+        self.dt = dt
+        self.base = base
+        # cache files are keyed by the absolute path, so same-named recordings
+        # in different directories do not share them
+        key = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+        name = f'{os.path.basename(path)}.{key}'
+        array = path.endswith('.npy')
+        raw = None if array else os.path.join(cache_dir, f'{name}.f64')
+        levels = os.path.join(cache_dir, f'{name}.b{base}.npz')
+        meta = os.path.join(cache_dir, f'{name}.b{base}.json')
+        stamp = _stamp(path)
+
+        try:
+            with open(meta) as f:
+                cached = json.load(f)
+            if cached['source'] != stamp:
+                raise ValueError(meta)
+            self.stats = cached['stats']
+            with np.load(levels) as f:
+                self.levels = [None] * base + [(f[f'min{k}'], f[f'max{k}']) for k in range(base, cached['depth'])]
+        except (OSError, KeyError, ValueError):
+            chunks = _array_chunks(path, chunk) if array else _text_chunks(path, chunk)
+            os.makedirs(cache_dir, exist_ok=True)
+            self._build(chunks, raw, levels, meta, stamp)
+
+        n = self.stats['count']
+        if array:
+            self.y = np.load(path, mmap_mode='r').reshape(-1)
+        else:
+            self.y = np.memmap(raw, dtype=np.float64, mode='r', shape=(n,)) if n else np.empty(0)
+
+    def _build(self, chunks, raw, levels, meta, stamp):
+        block = 1 << self.base
+        count, mean, m2 = 0, 0.0, 0.0
+        lo, hi = np.inf, -np.inf
+        i_min, i_max, v_min, v_max = [], [], [], []
+        carry = np.empty(0)
+
+        # write to temporary names first so a reader never sees a partial cache;
+        # raw is None when the source can be memory-mapped as it is
+        tmp = f'{raw}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') if raw else contextlib.nullcontext() as f:
+            for values in chunks:
+                if raw:
+                    values.tofile(f)
+
+                # running mean and variance, merged chunk by chunk (Chan et al.)
+                if len(values):
+                    k, mu = len(values), values.mean()
+                    delta = mu - mean
+                    mean += delta * k / (count + k)
+                    m2 += ((values - mu) ** 2).sum() + delta * delta * count * k / (count + k)
+                    lo, hi = min(lo, values.min()), max(hi, values.max())
+
+                # min/max of every whole block, a partial block waits for the next chunk
+                offset = count - len(carry)
+                count += len(values)
+                values = np.concatenate((carry, values))
+                whole = len(values) - len(values) % block
+                carry = values[whole:]
+                self._blocks(values[:whole], offset, i_min, i_max, v_min, v_max)
+            self._blocks(carry, count - len(carry), i_min, i_max, v_min, v_max)
+        if raw:
+            os.replace(tmp, raw)
+
+        self.stats = dict(count=count, mean=mean, std=float(np.sqrt(m2 / count)) if count else 0.0,
+                          min=float(lo) if count else None, max=float(hi) if count else None)
+
+        # coarser levels pair up neighbouring bins, as in MinMaxPyramid
+        self.levels = [None] * self.base
+        if count:
+            level = [np.concatenate(a) for a in (i_min, i_max, v_min, v_max)]
+            self.levels.append(tuple(level[:2]))
+            while len(level[0]) > 1:
+                if len(level[0]) % 2:
+                    level = [np.append(a, a[-1]) for a in level]
+                a, b = slice(0, None, 2), slice(1, None, 2)
+                lower = level[2][a] <= level[2][b]
+                higher = level[3][a] >= level[3][b]
+                level = [np.where(lower, level[0][a], level[0][b]), np.where(higher, level[1][a], level[1][b]),
+                         np.where(lower, level[2][a], level[2][b]), np.where(higher, level[3][a], level[3][b])]
+                self.levels.append(tuple(level[:2]))
+
+        arrays = {}
+        for k in range(self.base, len(self.levels)):
+            arrays[f'min{k}'], arrays[f'max{k}'] = self.levels[k]
+        tmp = f'{levels}.{os.getpid()}.tmp.npz'
+        np.savez(tmp, **arrays)
+        os.replace(tmp, levels)
+        tmp = f'{meta}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(dict(source=stamp, stats=self.stats, depth=len(self.levels)), f)
+        os.replace(tmp, meta)
+
+    def _blocks(self, values, offset, i_min, i_max, v_min, v_max):
+        if not len(values):
+            return
+        block = 1 << self.base
+        n_blocks = -(-len(values) // block)
+        blocks = np.pad(values, (0, n_blocks * block - len(values)), mode='edge').reshape(n_blocks, block)
+        starts = offset + np.arange(n_blocks) * block
+        last = offset + len(values) - 1
+        i_min.append(np.minimum(starts + blocks.argmin(axis=1), last))
+        i_max.append(np.minimum(starts + blocks.argmax(axis=1), last))
+        v_min.append(blocks.min(axis=1))
+        v_max.append(blocks.max(axis=1))
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def x_start(self):
+        return self.t0
+
+    @property
+    def x_end(self):
+        return self.t0 + self.dt * max(len(self) - 1, 0)
+
+    def x(self, idx):
+        return self.t0 + self.dt * np.asarray(idx)
+
+    def window(self, start, end, n_points):
+        # samples covering [start, end], reduced to about 2 * n_points points; the
+        # same contract as MinMaxPyramid.window, so a Recording can stand in for
+        # the pyramid of an InteractivePlot in lod mode
+        n = len(self)
+        if n == 0 or end < self.x_start or start > self.x_end:
+            return self.x(np.arange(0)), self.y[:0]
+        # one sample beyond each bound, so lines run to the edges of the view
+        i0 = max(int(np.ceil((start - self.t0) / self.dt)) - 1, 0)
+        i1 = min(int(np.floor((end - self.t0) / self.dt)) + 2, n)
+
+        count = i1 - i0
+        level = 0 if count <= 2 * n_points else min(int(np.ceil(np.log2(count / n_points))), len(self.levels) - 1)
+        if level == 0:
+            return self.x(np.arange(i0, i1)), np.asarray(self.y[i0:i1])
+        if self.levels[level] is None:
+            # finer than the stored levels: at most 2**base * n_points raw samples
+            return minmax_envelope(self.x(np.arange(i0, i1)), self.y[i0:i1], n_bins=n_points)
+
+        i_min, i_max = self.levels[level]
+        b0, b1 = i0 >> level, ((i1 - 1) >> level) + 1
+        idx = np.unique(np.concatenate(([i0], i_min[b0:b1], i_max[b0:b1], [i1 - 1])))
+        return self.x(idx), np.asarray(self.y[idx])
+
+    def plot(self, width=600, **options):
+        # InteractivePlot built from the overview, re-slicing windows from here
+        from .plotting import InteractivePlot
+
+        x, y = self.window(self.x_start, self.x_end, n_points=width)
+        return InteractivePlot(x, y, width=width, lod=self, **options)
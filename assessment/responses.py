@@ -0,0 +1,73 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+# the log the rating widgets write to when none is given to them
+current = None
+
+
+class ResponseLog:
+    # append-only JSON Lines log of study responses; record() only queues the
+    # response, and a writer thread appends whatever has queued up in one write,
+    # so a click never waits on the disk
+    def __init__(self, path, participant=None, session=None):
+        self.path = path
+        self.participant = participant
+        self.session = session or uuid.uuid4().hex
+        self._seq = 0
+        self._queue = queue.SimpleQueue()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, widget, value, stimulus=None, **fields):
+        # fields are added to the record as they are, e.g. timings
+        self._seq += 1
+        self._queue.put(dict(participant=self.participant, session=self.session, seq=self._seq,
+                             widget=widget, stimulus=stimulus, value=value,
+                             monotonic_ns=time.monotonic_ns(), time=time.time(), **fields))
+
+    def _write(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not None]
+            if records:
+                self._file.write(''.join(json.dumps(r) + '\n' for r in records))
+                self._file.flush()
+            if len(records) < len(batch):
+                return
+
+    def close(self):
+        # write out everything recorded so far; safe to call more than once
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        if not self._file.closed:
+            self._file.close()
+        atexit.unregister(self.close)
+
+
+def open_log(path, participant=None, session=None):
+    # start logging every rating widget's responses to path
+    global current
+    if current is not None:
+        current.close()
+    current = ResponseLog(path, participant, session)
+    return current
+
+
+def read_log(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,228 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .matrix_profile import _inverse_norm, mass, sliding_mean_std
+
+
+def _znorm(x):
+    x = np.asarray(x, dtype=np.float64)
+    sigma = x.std()
+    return (x - x.mean()) / sigma if sigma > 0 else np.zeros_like(x)
+
+
+def _running(x, r, reduce, fill):
+    # reduce over i - r .. i + r along the last axis, by doubling: spans of 2**k
+    # from two of 2**(k - 1), and the full width from two overlapping spans, so
+    # the cost grows with log r rather than r
+    pad = [(0, 0)] * (x.ndim - 1) + [(r, r)]
+    y = np.pad(x, pad, constant_values=fill)
+    width, span = 2 * r + 1, 1
+    while 2 * span <= width:
+        y = reduce(y[..., :-span], y[..., span:])
+        span *= 2
+    return reduce(y[..., :x.shape[-1]], y[..., width - span:width - span + x.shape[-1]])
+
+
+def _envelope(x, r):
+    # running max and min over i - r .. i + r along the last axis
+    return _running(x, r, np.maximum, -np.inf), _running(x, r, np.minimum, np.inf)
+
+
+def _excess(Z, upper, lower):
+    # squared distance of each point of Z to an envelope, the terms of LB_Keogh
+    excess = np.maximum(Z - upper, 0.0) + np.maximum(lower - Z, 0.0)
+    return excess * excess
+
+
+def _tail(x):
+    # sums of x[:, j:] for j = 0 .. m, the last being 0
+    out = np.zeros((x.shape[0], x.shape[1] + 1))
+    out[:, :-1] = np.cumsum(x[:, ::-1], axis=1)[:, ::-1]
+    return out
+
+
+def dtw(Z, q, r, abandon=np.inf, rest=None):
+    # squared DTW distance, within a Sakoe-Chiba band of r, between q and every
+    # row of Z at once; rows are dropped as soon as every cell of their last
+    # computed DP row, plus rest[:, i] (a lower bound on the cost of the DP rows
+    # after i, if given), reaches abandon, and get inf
+    #
+    # along a DP row D[i, j] = c[j] + min(a[j], D[i, j - 1]), where a[j] is the
+    # smaller of the two cells above; unrolled, that is the prefix sum of c plus
+    # a running minimum, so each row is a few vectorized passes. rows are kept
+    # in band coordinates, column j of row i at j - i + r, so only the band is
+    # ever touched
+    B, m = Z.shape
+    r = min(r, m - 1)
+    w = 2 * r + 1
+    result = np.full(B, np.inf)
+    alive = np.arange(B)
+    # the previous DP row plus one cell past the band; before the first row only
+    # the cell diagonally before the start is set
+    prev = np.full((B, w + 1), np.inf)
+    prev[:, r] = 0.0
+    for i in range(m):
+        lo, hi = max(0, i - r), min(m - 1, i + r)
+        b0, b1 = lo - i + r, hi - i + r + 1
+        c = (Z[:, lo:hi + 1] - q[i]) ** 2
+        a = np.minimum(prev[:, b0:b1], prev[:, b0 + 1:b1 + 1])
+        S = np.cumsum(c, axis=1)
+        row = S + np.minimum.accumulate(a - (S - c), axis=1)
+
+        prev[:, :] = np.inf
+        prev[:, b0:b1] = row
+        bound = row.min(axis=1)
+        if rest is not None:
+            bound += rest[:, i]
+        keep = bound < abandon
+        if not keep.all():
+            Z, prev, alive = Z[keep], prev[keep], alive[keep]
+            if rest is not None:
+                rest = rest[keep]
+            if not len(alive):
+                return result
+    result[alive] = prev[:, r]
+    return result
+
+
+class QueryIndex:
+    # query-by-example search over one signal: the top k non-overlapping matches
+    # of a query (e.g. a drawn sketch) by z-normalized Euclidean or banded DTW
+    # distance; sliding statistics are computed once per query length
+    #
+    # Euclidean queries take a few milliseconds on the 40k-sample ABP trace.
+    # DTW queries are exact but not that fast: on a quasi-periodic signal
+    # thousands of windows get past the lower bounds, and the DP over them
+    # takes tenths of a second to seconds for queries of 64 to 256 samples
+    def __init__(self, T):
+        self.T = np.asarray(T, dtype=np.float64)
+        self.T = self.T - self.T.mean()
+        self._stats = {}
+
+    def _windows(self, m):
+        if m not in self._stats:
+            mu, sigma = sliding_mean_std(self.T, m)
+            self._stats[m] = (mu, _inverse_norm(sigma, m) * np.sqrt(m))
+        return self._stats[m]
+
+    def _z(self, idx, m):
+        mu, inv = self._windows(m)
+        return (sliding_window_view(self.T, m)[idx] - mu[idx, None]) * inv[idx, None]
+
+    def search(self, query, k=3, m=None, metric='ed', band=0.1, exclusion=None, batch=256):
+        # start indices and distances of the k best matches, best first; the query
+        # is resampled to m samples first if given, and matches are at least
+        # exclusion (m / 2 by default) apart
+        q = np.asarray(query, dtype=np.float64)
+        if m is not None and m != len(q):
+            q = np.interp(np.linspace(0, len(q) - 1, m), np.arange(len(q)), q)
+        m = len(q)
+        if m < 4 or m > len(self.T):
+            raise ValueError(f"query length {m} does not fit a signal of {len(self.T)} samples")
+        if exclusion is None:
+            exclusion = max(m // 2, 1)
+
+        if metric == 'ed':
+            # the whole distance profile in O(n log n) is cheaper than pruning
+            return self._top_k(mass(q, self.T), k, exclusion)
+        if metric == 'dtw':
+            return self._search_dtw(_znorm(q), k, max(int(band * m), 0), exclusion, batch)
+        raise ValueError(f"unknown metric {metric!r}, expected 'ed' or 'dtw'")
+
+    def _top_k(self, dist, k, exclusion):
+        indices, distances = [], []
+        dist = dist.copy()
+        for _ in range(k):
+            i = int(np.argmin(dist))
+            if not np.isfinite(dist[i]):
+                break
+            indices.append(i)
+            distances.append(dist[i])
+            dist[max(i - exclusion + 1, 0):i + exclusion] = np.inf
+        return np.array(indices, dtype=np.int64), np.array(distances)
+
+    def _search_dtw(self, q, k, r, exclusion, batch):
+        m = len(q)
+        mu, inv = self._windows(m)
+        L = len(mu)
+        T = self.T
+
+        # cascade of lower bounds on the squared distance: LB_Kim from the first
+        # and last points, for every window in O(1) from the running statistics;
+        # then, for the windows it does not rule out, LB_Keogh both ways round
+        lb = ((T[:L] - mu) * inv - q[0]) ** 2 + ((T[m - 1:] - mu) * inv - q[-1]) ** 2
+        upper, lower = _envelope(q, r)
+        # the Euclidean distance bounds DTW from above, so the windows closest by
+        # it are measured first and give a tight threshold at once
+        ed = mass(q, T)
+
+        # exact distances found so far; a window abandoned against a threshold
+        # keeps that threshold as its (tighter) lower bound
+        exact = np.full(L, np.nan)
+        excluded = np.zeros(L, dtype=bool)
+        indices, distances = [], []
+        for _ in range(k):
+            order = np.flatnonzero(~excluded)
+            if not len(order):
+                break
+            seed = order[np.argpartition(ed[order], min(8, len(order) - 1))[:8]]
+            order = order[np.argsort(lb[order], kind='stable')]
+            # bounds as sorted; they only grow, so once one reaches the threshold
+            # so has every later one
+            sorted_lb = lb[order]
+            best, best_i = np.inf, -1
+            # small batches first, so a good threshold is found before many full
+            # distances are computed against a loose one
+            idx, start, size = seed, 0, 16
+            while True:
+                best, best_i = self._measure(idx, q, r, upper, lower, lb, exact, best, best_i)
+                if start >= len(order) or sorted_lb[start] >= best:
+                    break
+                idx = order[start:start + size]
+                start, size = start + size, min(2 * size, batch)
+            if best_i < 0:
+                break
+            indices.append(int(best_i))
+            distances.append(np.sqrt(best))
+            excluded[max(best_i - exclusion + 1, 0):best_i + exclusion] = True
+        return np.array(indices, dtype=np.int64), np.array(distances)
+
+    def _measure(self, idx, q, r, upper, lower, lb, exact, best, best_i):
+        # exact distances of the windows idx that the lower bounds do not rule
+        # out against best; returns the best distance and window after them
+        m = len(q)
+        idx = idx[lb[idx] < best]
+        known = ~np.isnan(exact[idx])
+        for i in idx[known]:
+            if exact[i] < best:
+                best, best_i = exact[i], i
+        idx = idx[~known]
+        if not len(idx):
+            return best, best_i
+
+        # LB_Keogh of the windows against the query envelope, then the other way
+        # round; their terms also bound the cost of the DP rows still to come
+        Z = self._z(idx, m)
+        by_column = _excess(Z, upper, lower)
+        cand_upper, cand_lower = _envelope(Z, r)
+        by_row = _excess(np.broadcast_to(q, Z.shape), cand_upper, cand_lower)
+        by_column, by_row = _tail(by_column), _tail(by_row)
+        lb[idx] = np.maximum(lb[idx], np.maximum(by_column[:, 0], by_row[:, 0]))
+        keep = lb[idx] < best
+        if not keep.any():
+            return best, best_i
+        idx, Z, by_column, by_row = idx[keep], Z[keep], by_column[keep], by_row[keep]
+
+        # after DP row i every later row is still to be crossed, and every column
+        # beyond i + r
+        rows = np.arange(m)
+        rest = np.maximum(by_row[:, rows + 1], by_column[:, np.minimum(rows + r + 1, m)])
+        d = dtw(Z, q, r, abandon=best, rest=rest)
+        done = np.isfinite(d)
+        exact[idx[done]] = d[done]
+        lb[idx[~done]] = np.maximum(lb[idx[~done]], best)
+        if done.any():
+            j = int(np.argmin(d))
+            if d[j] < best:
+                best, best_i = d[j], idx[j]
+        return best, best_i
@@ -0,0 +1,88 @@
+import numpy as np
+
+from .matrix_profile import matrix_profile
+
+
+def dominant_period(T, max_period=None):
+    # length of the shortest clear repetition in T: the first positive local
+    # maximum of the autocorrelation after it first goes negative; None if there
+    # is none
+    T = np.asarray(T, dtype=np.float64)
+    T = T - T.mean()
+    n = len(T)
+    max_period = max_period or n // 4
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    f = np.fft.rfft(T, size)
+    ac = np.fft.irfft(f * np.conj(f), size)[:max_period + 1]
+    negative = np.flatnonzero(ac < 0)
+    if not len(negative):
+        return None
+    k = np.arange(negative[0] + 1, max_period)
+    peaks = k[(ac[k] > 0) & (ac[k] >= ac[k - 1]) & (ac[k] >= ac[k + 1])]
+    return int(peaks[0]) if len(peaks) else None
+
+
+def arc_curve(I, m, edge=5):
+    # corrected arc curve of a matrix profile index (FLUSS): the number of
+    # nearest-neighbour arcs passing over each position, relative to the number
+    # expected if neighbours were random; values near 0 mark regime changes.
+    # the first and last edge * m positions are set to 1, too close to the ends
+    # to be judged
+    L = len(I)
+    i = np.flatnonzero(I >= 0)
+    small = np.minimum(i, I[i])
+    large = np.maximum(i, I[i])
+    arcs = np.cumsum(np.bincount(small, minlength=L) - np.bincount(large, minlength=L))[:L]
+
+    j = np.arange(L)
+    ideal = 2.0 * j * (L - j) / L
+    cac = np.ones(L)
+    np.divide(arcs, ideal, out=cac, where=ideal > 0)
+    np.minimum(cac, 1.0, out=cac)
+    edge = min(edge * m, L // 10)
+    cac[:edge] = 1.0
+    cac[L - edge:] = 1.0
+    return cac
+
+
+def regimes(cac, n_regimes, exclusion):
+    # positions of the n_regimes - 1 lowest points of the arc curve, at least
+    # exclusion apart, in order along the signal
+    cac = cac.copy()
+    found = []
+    for _ in range(n_regimes - 1):
+        i = int(np.argmin(cac))
+        if cac[i] >= 1.0:
+            break
+        found.append(i)
+        cac[max(i - exclusion, 0):i + exclusion] = np.inf
+    return np.sort(np.array(found, dtype=np.int64))
+
+
+def segment(T, n_regimes, m=None, max_points=4000):
+    # sample positions of n_regimes - 1 boundaries between regimes of T and the
+    # arc curve they were read from, indexed by sample
+    #
+    # T is first reduced to at most max_points block means, so the matrix
+    # profile costs the same for any length of signal; m is the subsequence
+    # length in samples, by default the dominant period of T
+    T = np.asarray(T, dtype=np.float64)
+    n = len(T)
+    factor = max(-(-n // max_points), 1)
+    reduced = T[:n - n % factor].reshape(-1, factor).mean(axis=1)
+
+    if m is None:
+        period = dominant_period(reduced)
+        m_reduced = period if period else len(reduced) // 50
+    else:
+        m_reduced = m // factor
+    m_reduced = int(min(max(m_reduced, 4), len(reduced) // 4))
+
+    _, I = matrix_profile(reduced, m_reduced)
+    cac = arc_curve(I, m_reduced)
+    found = regimes(cac, n_regimes, exclusion=min(5 * m_reduced, len(cac) // (2 * n_regimes)))
+    # the curve is stretched back to one value per sample; the samples past the
+    # last whole block, and past the last subsequence, count as no change
+    curve = np.ones(n)
+    curve[:len(cac) * factor] = np.repeat(cac, factor)
+    return found * factor, curve
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+
+
+def resample(x, y, length):
+    # length points spaced evenly along the stroke, so strokes drawn at any
+    # speed or pointer rate compare point for point
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) == 0:
+        raise ValueError("cannot resample an empty stroke")
+    s = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))))
+    if s[-1] == 0:
+        return np.full(length, x[0]), np.full(length, y[0])
+    u = np.linspace(0.0, s[-1], length)
+    return np.interp(u, s, x), np.interp(u, s, y)
+
+
+class SketchStore:
+    # strokes resampled to a fixed length, held in one float32 array of shape
+    # (strokes, length, 2) next to int columns of participant, panel and capture
+    # time; participants are stored as codes into self.participants, by name
+    # ('' when not given)
+    def __init__(self, length=64, capacity=256):
+        self.length = length
+        self.size = 0
+        self.participants = []
+        self._codes = {}
+        self.points = np.empty((capacity, length, 2), dtype=np.float32)
+        self.participant = np.empty(capacity, dtype=np.int32)
+        self.panel = np.empty(capacity, dtype=np.int32)
+        self.time_ns = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def _code(self, participant):
+        participant = '' if participant is None else str(participant)
+        if participant not in self._codes:
+            self._codes[participant] = len(self.participants)
+            self.participants.append(participant)
+        return self._codes[participant]
+
+    def _grow(self, n):
+        if n <= len(self.points):
+            return
+        size = max(2 * len(self.points), n)
+        for name in ('points', 'participant', 'panel', 'time_ns'):
+            old = getattr(self, name)
+            new = np.empty((size,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, x, y, participant=None, panel=0):
+        self._grow(self.size + 1)
+        i = self.size
+        self.points[i, :, 0], self.points[i, :, 1] = resample(x, y, self.length)
+        self.participant[i] = self._code(participant)
+        self.panel[i] = panel
+        self.time_ns[i] = time.time_ns()
+        self.size += 1
+        return i
+
+    def select(self, participant=None, panel=None):
+        # indices of the strokes of one participant and/or panel
+        keep = np.ones(self.size, dtype=bool)
+        if participant is not None:
+            keep &= self.participant[:self.size] == self._codes.get(str(participant), -1)
+        if panel is not None:
+            keep &= self.panel[:self.size] == panel
+        return np.flatnonzero(keep)
+
+    def shapes(self, indices=None):
+        # the y values of strokes, i.e. the drawn patterns as query sequences
+        indices = np.arange(self.size) if indices is None else indices
+        return self.points[indices, :, 1]
+
+    def save(self, path):
+        np.savez(path, points=self.points[:self.size], participant=self.participant[:self.size],
+                 panel=self.panel[:self.size], time_ns=self.time_ns[:self.size],
+                 participants=np.array(self.participants, dtype=str))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            store = cls(length=f['points'].shape[1], capacity=max(len(f['points']), 1))
+            store.size = len(f['points'])
+            store.points[:store.size] = f['points']
+            store.participant[:store.size] = f['participant']
+            store.panel[:store.size] = f['panel']
+            store.time_ns[:store.size] = f['time_ns']
+            for p in f['participants']:
+                store._code(str(p))
+        return store
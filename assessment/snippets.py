@@ -0,0 +1,114 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .matrix_profile import _inverse_norm, mass, sliding_dot_product, sliding_mean_std
+
+
+def _rolling_min(a, w):
+    # minimum over every run of w consecutive values along the last axis, in
+    # O(n) with block prefix and suffix minima (van Herk / Gil-Werman)
+    n = a.shape[-1]
+    pad = [(0, 0)] * (a.ndim - 1) + [(0, (-n) % w)]
+    b = np.pad(a, pad, constant_values=np.inf)
+    blocks = b.reshape(*b.shape[:-1], -1, w)
+    prefix = np.minimum.accumulate(blocks, axis=-1).reshape(b.shape)
+    suffix = np.minimum.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(b.shape)
+    return np.minimum(suffix[..., :n - w + 1], prefix[..., w - 1:n])
+
+
+def _s_distances(T, start, w, s, mu, inv, dot0):
+    # z-normalized distances from the w length-s subsequences starting at
+    # start .. start + w - 1 to every length-s subsequence of T, one row each;
+    # each row's dot products follow from the previous row in O(n)
+    N = len(T) - s + 1
+    D = np.empty((w, N))
+    qt = np.empty(N)
+    for r in range(w):
+        i = start + r
+        if r == 0:
+            qt[:] = sliding_dot_product(T[i:i + s], T)
+        else:
+            qt[1:] = qt[:-1] - T[i - 1] * T[:N - 1] + T[i + s - 1] * T[s:]
+            qt[0] = dot0[i]
+        rho = (qt - s * mu[i] * mu) * (inv[i] * inv)
+        D[r] = np.sqrt(np.maximum(2.0 * s * (1.0 - rho), 0.0))
+    return D
+
+
+class SnippetFinder:
+    # time series snippets (Imani et al., 2018): the candidates are the
+    # non-overlapping length-m windows of T, each is compared with every window
+    # of T by MPdist, and snippets are picked greedily to cover T best
+    #
+    # the MPdist profiles are computed once; snippets(k) for any k reuses them,
+    # and the greedy order is kept so a sweep over k only extends it
+    def __init__(self, T, m, percentage=1.0, mpdist_percentage=0.05, chunk=4096):
+        self.T = np.asarray(T, dtype=np.float64)
+        self.m = m
+        n = len(self.T)
+        if m < 4 or n < 2 * m:
+            raise ValueError(f"snippet length {m} needs at least {2 * m} samples, got {n}")
+
+        self.candidates = np.arange(0, n - m + 1, m)
+        # subsequence length used inside MPdist
+        s = min(max(int(percentage * m), 4), m)
+        w = m - s + 1
+
+        if w == 1:
+            # MPdist of two windows compared whole is their plain distance
+            self.profiles = np.array([mass(self.T[i:i + m], self.T) for i in self.candidates])
+        else:
+            T = self.T - self.T.mean()
+            mu, sigma = sliding_mean_std(T, s)
+            inv = _inverse_norm(sigma, s)
+            dot0 = sliding_dot_product(T[:s], T)
+            # index of the distance MPdist reports among the 2w pooled values
+            k = min(int(np.ceil(mpdist_percentage * 2 * m)), 2 * w - 1)
+
+            self.profiles = np.empty((len(self.candidates), n - m + 1))
+            for c, i in enumerate(self.candidates):
+                D = _s_distances(T, i, w, s, mu, inv, dot0)
+                # nearest neighbour of each candidate piece inside every window,
+                # and of every window piece among the candidate pieces
+                row = _rolling_min(D, w)
+                col = sliding_window_view(D.min(axis=0), w)
+                for j in range(0, row.shape[1], chunk):
+                    pooled = np.concatenate((row[:, j:j + chunk].T, col[j:j + chunk]), axis=1)
+                    self.profiles[c, j:j + chunk] = np.partition(pooled, k, axis=1)[:, k]
+
+        self._order = []
+        self._covered = np.full(self.profiles.shape[1], np.inf)
+
+    def _extend(self, k):
+        # greedy choice: the candidate that most lowers the area under the
+        # element-wise minimum of the chosen profiles
+        while len(self._order) < k:
+            area = np.minimum(self.profiles, self._covered).sum(axis=1)
+            area[self._order] = np.inf
+            best = int(np.argmin(area))
+            self._order.append(best)
+            np.minimum(self._covered, self.profiles[best], out=self._covered)
+
+    def snippets(self, k):
+        # start index of each of the k snippets, their MPdist profiles, the
+        # fraction of T each one represents, and a snippet label per sample
+        k = min(k, len(self.candidates))
+        self._extend(k)
+        chosen = self._order[:k]
+        profiles = self.profiles[chosen]
+
+        nearest = np.argmin(profiles, axis=0)
+        fractions = np.bincount(nearest, minlength=k) / len(nearest)
+        # windows are labelled by where they start; the last m - 1 samples
+        # belong to the final window
+        labels = np.concatenate((nearest, np.full(self.m - 1, nearest[-1])))
+        return self.candidates[chosen], profiles, fractions, labels
+
+
+def snippets(T, m, k, percentage=1.0, mpdist_percentage=0.05):
+    return SnippetFinder(T, m, percentage, mpdist_percentage).snippets(k)
+
+
+def label_boundaries(labels):
+    # sample positions where the snippet label changes, i.e. pattern boundaries
+    return np.flatnonzero(np.diff(labels)) + 1
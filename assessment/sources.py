@@ -0,0 +1,43 @@
+import hashlib
+import weakref
+
+import numpy as np
+
+# sources that are not yet part of a document, keyed by a digest of their data,
+# so every figure built for the same signal references one ColumnDataSource
+# and Bokeh serializes it once per document
+_sources = weakref.WeakValueDictionary()
+
+
+def as_column(values, float32=False):
+    # contiguous numpy column, so Bokeh sends it as a base64 buffer instead of a
+    # JSON list of numbers; integer columns that fit are narrowed to int32, and
+    # float columns can be downcast to float32 when only needed for display
+    column = np.asarray(values)
+    if column.dtype.kind in 'biu':
+        info = np.iinfo(np.int32)
+        if column.size == 0 or (column.min() >= info.min and column.max() <= info.max):
+            return np.ascontiguousarray(column, dtype=np.int32)
+    return np.ascontiguousarray(column, dtype=np.float32 if float32 else np.float64)
+
+
+def digest(data):
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(data):
+        column = np.ascontiguousarray(data[name])
+        h.update(f'{name}:{column.dtype.str}:{column.shape}'.encode())
+        h.update(column)
+    return h.hexdigest()
+
+
+def shared_source(data):
+    from bokeh.models import ColumnDataSource
+
+    key = digest(data)
+    source = _sources.get(key)
+    # a model can only belong to one document, so once a source has been shown
+    # the next figure for that data starts a new one
+    if source is None or source.document is not None:
+        source = ColumnDataSource(data=data)
+        _sources[key] = source
+    return source
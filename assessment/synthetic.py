@@ -0,0 +1,120 @@
+import json
+import os
+
+import numpy as np
+
+# pattern shapes over one period, as functions of the phase in [0, 1) with
+# values in [-1, 1]; the label of a sample is the index of its shape here
+SHAPES = {
+    'sine': lambda u: np.sin(2 * np.pi * u),
+    'square': lambda u: np.where(u < 0.5, 1.0, -1.0),
+    'sawtooth': lambda u: 2 * u - 1,
+    'triangle': lambda u: 1 - 4 * np.abs(u - 0.5),
+    'bump': lambda u: 2 * np.exp(-0.5 * ((u - 0.5) / 0.08) ** 2) - 1,
+    'flat': lambda u: np.zeros_like(u),
+}
+PATTERNS = list(SHAPES)
+
+# samples generated at a time; noise is drawn per chunk, so a seed gives the
+# same signal whether it is generated in memory or written to disk
+CHUNK = 1 << 22
+
+
+def random_schedule(n_segments, segment_length, patterns=('sine', 'square', 'sawtooth'), seed=None):
+    # n_segments of segment_length samples each, cycling through the patterns in
+    # a random order with no pattern directly following itself
+    rng = np.random.default_rng(seed)
+    names = [patterns[rng.integers(len(patterns))]]
+    for _ in range(n_segments - 1):
+        choices = [p for p in patterns if p != names[-1]] or list(patterns)
+        names.append(choices[rng.integers(len(choices))])
+    return [(name, segment_length) for name in names]
+
+
+def _arrays(schedule, period):
+    # a schedule is a list of (pattern, samples) or (pattern, samples, period)
+    codes = np.array([PATTERNS.index(entry[0]) for entry in schedule], dtype=np.uint8)
+    lengths = np.array([entry[1] for entry in schedule], dtype=np.int64)
+    periods = np.array([entry[2] if len(entry) > 2 else period for entry in schedule], dtype=np.float64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return codes, lengths, periods, starts
+
+
+def _render(arrays, start, end, noise, seed, dtype):
+    # samples start .. end - 1, all segments at once: each sample looks up its
+    # segment by repeat, and each shape is evaluated on all of its samples in
+    # one call
+    codes, lengths, periods, starts = arrays
+    s0 = int(np.searchsorted(starts, start, side='right')) - 1
+    s1 = int(np.searchsorted(starts, end, side='left'))
+    lo = np.maximum(starts[s0:s1], start)
+    hi = np.minimum(starts[s0:s1] + lengths[s0:s1], end)
+    segment = np.repeat(np.arange(s0, s1), hi - lo)
+
+    position = np.arange(start, end) - starts[segment]
+    phase = np.mod(position, periods[segment]) / periods[segment]
+    labels = codes[segment]
+    signal = np.empty(end - start, dtype=dtype)
+    for code in np.unique(labels):
+        mask = labels == code
+        signal[mask] = SHAPES[PATTERNS[code]](phase[mask])
+    if noise:
+        rng = np.random.default_rng([seed, start // CHUNK])
+        signal += (noise * rng.standard_normal(end - start)).astype(dtype)
+    return signal, labels
+
+
+def _seed(seed):
+    # a fresh seed when none is given, drawn from the OS so it can be recorded
+    return np.random.SeedSequence().entropy if seed is None else seed
+
+
+def generate(schedule, period=100, noise=0.0, seed=None, dtype=np.float64):
+    # signal and per-sample labels (indices into PATTERNS) for a schedule;
+    # noise is the standard deviation of added Gaussian noise, relative to the
+    # unit amplitude of the shapes (0.1 for the 10% noise dataset)
+    seed = _seed(seed)
+    arrays = _arrays(schedule, period)
+    n = int(arrays[1].sum())
+    signal = np.empty(n, dtype=dtype)
+    labels = np.empty(n, dtype=np.uint8)
+    for start in range(0, n, CHUNK):
+        end = min(start + CHUNK, n)
+        signal[start:end], labels[start:end] = _render(arrays, start, end, noise, seed, dtype)
+    return signal, labels
+
+
+def write(path, schedule, period=100, noise=0.0, seed=None, dtype=np.float32):
+    # write a generated dataset as a directory of columns, signal.npy and
+    # labels.npy, next to meta.json recording how it was made; the columns are
+    # filled chunk by chunk, so the dataset can be far larger than memory and
+    # is read back (or passed to Recording) as memory maps; without a seed, the
+    # one drawn is recorded so the dataset can be made again
+    seed = _seed(seed)
+    arrays = _arrays(schedule, period)
+    n = int(arrays[1].sum())
+    os.makedirs(path, exist_ok=True)
+    signal = np.lib.format.open_memmap(os.path.join(path, 'signal.npy'), mode='w+', dtype=dtype, shape=(n,))
+    labels = np.lib.format.open_memmap(os.path.join(path, 'labels.npy'), mode='w+', dtype=np.uint8, shape=(n,))
+    for start in range(0, n, CHUNK):
+        end = min(start + CHUNK, n)
+        signal[start:end], labels[start:end] = _render(arrays, start, end, noise, seed, dtype)
+    signal.flush()
+    labels.flush()
+    del signal, labels
+
+    meta = dict(samples=n, patterns=PATTERNS, schedule=[list(entry) for entry in schedule],
+                period=period, noise=noise, seed=seed, dtype=np.dtype(dtype).name)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+
+
+def read(path):
+    # signal and labels as memory maps, and the meta data written with them;
+    # snippets.label_boundaries gives the ground-truth pattern boundaries
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    signal = np.load(os.path.join(path, 'signal.npy'), mmap_mode='r')
+    labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+    return signal, labels, meta
+
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# one read-ahead thread for every server, so plots do not each keep one alive
+_prefetch = None
+
+
+def _executor():
+    global _prefetch
+    if _prefetch is None:
+        _prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix='window-prefetch')
+    return _prefetch
+
+
+class WindowServer:
+    # serves the samples of any window_size-wide range of a signal from pages of
+    # window_size samples; a window, with the sample beyond each side the plots
+    # add, spans at most three pages. recently used pages are kept, and the pages
+    # on either side of a request are read ahead on a background thread, so
+    # moving the window by up to its width never waits on the signal (which may
+    # be a memory map of a recording on disk); t is the x of each sample, or a
+    # function from sample indices to x
+    def __init__(self, t, signal, window_size, pages=8, float32=False):
+        self.t = t
+        self.signal = signal
+        self.page = max(int(window_size), 1)
+        self.n_pages = -(-len(signal) // self.page)
+        # room for a window and the page read ahead on each side
+        self.max_pages = max(pages, 5)
+        self.float32 = float32
+        self._pages = OrderedDict()
+
+    def _read(self, k):
+        start, end = k * self.page, (k + 1) * self.page
+        y = np.array(self.signal[start:end], dtype=np.float32 if self.float32 else np.float64)
+        return self._x(start, min(end, len(self.signal))), y
+
+    def _x(self, start, end):
+        if callable(self.t):
+            return self.t(np.arange(start, end))
+        return np.array(self.t[start:end])
+
+    def _get(self, k):
+        # the page, from the cache or read now; a page still being read ahead
+        # is waited for rather than read twice
+        page = self._pages.get(k)
+        if page is None:
+            page = self._pages[k] = _executor().submit(self._read, k)
+        self._pages.move_to_end(k)
+        return page.result()
+
+    def _read_ahead(self, first, last):
+        for j in (first - 1, last + 1):
+            if 0 <= j < self.n_pages and j not in self._pages:
+                self._pages[j] = _executor().submit(self._read, j)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def window(self, start, end):
+        # x and y of the samples at positions start .. end - 1
+        start, end = max(int(start), 0), min(int(end), len(self.signal))
+        if start >= end:
+            return self._x(0, 0), np.array(self.signal[:0])
+        first, last = start // self.page, (end - 1) // self.page
+        parts = [self._get(k) for k in range(first, last + 1)]
+        self._read_ahead(first, last)
+        offset = start - first * self.page
+        x = np.concatenate([p[0] for p in parts])[offset:offset + end - start]
+        y = np.concatenate([p[1] for p in parts])[offset:offset + end - start]
+        return x, y
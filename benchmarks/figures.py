@@ -0,0 +1,140 @@
+# times figure construction and layout building for every plot variant, and
+# measures the serialized document size and peak Python memory of each layout,
+# on the bundled datasets and on the ABP trace tiled to larger sizes; results
+# are written as JSON so two commits can be compared
+#
+#   python benchmarks/figures.py [--sizes 10000,100000,1000000,10000000] [--variants utils,utils_lib2]
+#                                [--options '{"decimate": true}'] [--out FILE] [--compare OLD_FILE]
+#
+# each entry has dataset, samples, variant, view, seconds (best of --repeat),
+# bytes and peak_bytes; --compare prints the ratio to a previous result file
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assessment import DATASETS, load, plotting  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+VIEWS = ['construct', 'zoom', 'patterns', 'multi_zoom']
+
+
+def build(view, signal, options):
+    # the layout a study page would show for one signal; the windowed variant
+    # shows a slider window where the others show a zoom overview
+    t = np.arange(len(signal))
+    plot = plotting.InteractivePlot(t, signal, **options)
+    windowed = plotting.STYLES[options.get('style', 'dark')].get('windowed')
+    if view == 'construct':
+        return plot.p
+    if view == 'zoom':
+        return plot.plot_with_window(len(signal) // 10) if windowed else plot.plot_with_zoom()
+    if view == 'patterns':
+        return plot.plot_with_patterns(3, show_layout=False)
+    # two signals side by side, as multi_plot_with_zoom lays them out
+    other = plotting.InteractivePlot(t, signal[::-1].copy(), **options)
+    views = [p.plot_with_window(len(signal) // 10) if windowed else p.plot_with_zoom() for p in (plot, other)]
+    return plotting._grid(views)
+
+
+def serialized_bytes(layout):
+    from bokeh.embed import json_item
+
+    return len(json.dumps(json_item(layout)))
+
+
+def measure(view, signal, options, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(view, signal, options)
+        seconds.append(time.perf_counter() - start)
+
+    # memory in a separate run, as tracing slows the timed ones down
+    tracemalloc.start()
+    layout = build(view, signal, options)
+    size = serialized_bytes(layout)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dict(seconds=min(seconds), bytes=size, peak_bytes=peak)
+
+
+def signals(sizes):
+    for name in DATASETS:
+        yield name, np.asarray(load(name))
+    abp = np.asarray(load('abp'))
+    for n in sizes:
+        yield f'abp_x{n}', np.resize(abp, n)
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old_path):
+    with open(old_path) as f:
+        old = {(r['dataset'], r['variant'], r['view']): r for r in json.load(f)['results']}
+    for r in results:
+        before = old.get((r['dataset'], r['variant'], r['view']))
+        if before is None:
+            continue
+        ratios = '  '.join(f"{key} x{r[key] / before[key]:.2f}" for key in ('seconds', 'bytes', 'peak_bytes')
+                           if before[key])
+        print(f"{r['dataset']:22s} {r['variant']:11s} {r['view']:11s} {ratios}")
+
+
+def main():
+    import bokeh
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    parser.add_argument('--variants', default=','.join(plotting.VARIANTS))
+    parser.add_argument('--views', default=','.join(VIEWS))
+    parser.add_argument('--options', default='{}', help='extra InteractivePlot options, as JSON')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=None)
+    parser.add_argument('--compare', default=None)
+    args = parser.parse_args()
+
+    sha = commit()
+    out = args.out or os.path.join(ROOT, 'benchmarks', 'results', f'figures-{sha or "local"}.json')
+    extra = json.loads(args.options)
+    sizes = [int(n) for n in args.sizes.split(',') if n]
+
+    results = []
+    for name, signal in signals(sizes):
+        for variant in args.variants.split(','):
+            options = {**plotting.VARIANTS[variant], **extra}
+            for view in args.views.split(','):
+                r = dict(dataset=name, samples=len(signal), variant=variant, view=view,
+                         **measure(view, signal, options, args.repeat))
+                results.append(r)
+                print(f"{name:22s} {variant:11s} {view:11s} {r['seconds'] * 1000:9.1f} ms "
+                      f"{r['bytes'] / 1e3:10.1f} KB {r['peak_bytes'] / 1e6:8.1f} MB peak", flush=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(dict(commit=sha, date=datetime.datetime.now().isoformat(timespec='seconds'),
+                       python=platform.python_version(), numpy=np.__version__, bokeh=bokeh.__version__,
+                       options=extra, results=results), f, indent=1)
+    print(out)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
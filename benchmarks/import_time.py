@@ -0,0 +1,44 @@
+# checks that importing the plotting modules stays cheap enough for batch
+# scripts and worker processes: each module is imported in a fresh interpreter
+# and the median wall time is compared with the budget
+#
+#   python benchmarks/import_time.py [--budget SECONDS] [--repeat N]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['assessment', 'utils', 'utils_lib', 'utils_lib2', 'utils_lib3', 'utils_lib4', 'utils_lib5', 'utils_lib6']
+BUDGET = 0.3
+
+CODE = "import time; t = time.perf_counter(); import {}; print(time.perf_counter() - t)"
+
+
+def import_time(module, repeat):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', CODE.format(module)], cwd=ROOT,
+                             check=True, capture_output=True, text=True).stdout
+        times.append(float(out.split()[-1]))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=float, default=BUDGET)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        seconds = import_time(module, args.repeat)
+        over = seconds > args.budget
+        failed |= over
+        print(f"{module:12s} {seconds * 1000:8.1f} ms{'  OVER BUDGET' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# writes one standalone page per bundled dataset and rendering backend; each
+# page pans the zoomed plot across the whole signal for a fixed number of
+# animation frames and reports the frames per second it achieved in the page
+# title, in a line under the plot and on the browser console
+#
+#   python benchmarks/render_fps.py [--out DIR] [--frames N] [--sizes 1000,5000,20000]
+#                                   [--headless] [--results FILE]
+#
+# open the pages in a browser (one tab at a time, so they do not compete for
+# the GPU) and note the reported fps for each dataset and backend; --sizes adds
+# the ABP trace tiled to each size, to find where WebGL starts to pay off
+# (plotting.WEBGL_THRESHOLD). --headless runs the pages one after another in
+# headless Chrome through selenium and writes the fps to a JSON file; headless
+# Chrome may draw WebGL in software, so compare its numbers with each other
+# rather than with a desktop browser
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assessment import DATASETS, InteractivePlot, load  # noqa: E402
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{name} {backend}</title>
+{resources}
+</head>
+<body>
+{div}
+<pre id="fps">running...</pre>
+{script}
+<script>
+(function () {{
+    function run(x_range) {{
+        var x0 = x_range.start, x1 = x_range.end;
+        var span = (x1 - x0) / 10;
+        var frames = 0, start = null;
+        function step(ts) {{
+            if (start === null) {{
+                start = ts;
+            }}
+            var left = x0 + (x1 - x0 - span) * frames / {frames};
+            x_range.setv({{start: left, end: left + span}});
+            frames += 1;
+            if (frames < {frames}) {{
+                window.requestAnimationFrame(step);
+            }} else {{
+                var fps = (frames - 1) * 1000 / (ts - start);
+                var line = '{name} {backend} {points} points: ' + fps.toFixed(1) + ' fps';
+                document.getElementById('fps').textContent = line;
+                document.title = line;
+                console.log(line);
+            }}
+        }}
+        window.requestAnimationFrame(step);
+    }}
+    // wait until BokehJS has built the document
+    var poll = window.setInterval(function () {{
+        if (window.Bokeh && Bokeh.documents.length) {{
+            window.clearInterval(poll);
+            run(Bokeh.documents[0].get_model_by_id('{x_range}'));
+        }}
+    }}, 50);
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+def signals(sizes):
+    for name in DATASETS:
+        yield name, np.asarray(load(name))
+    abp = np.asarray(load('abp'))
+    for n in sizes:
+        yield f'abp_x{n}', np.resize(abp, n)
+
+
+def run_headless(pages, timeout):
+    # the fps line each page reports, or None for a page that did not finish
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--ignore-gpu-blocklist')
+    driver = webdriver.Chrome(options=options)
+    results = {}
+    try:
+        for path in pages:
+            driver.get('file://' + os.path.abspath(path))
+            try:
+                WebDriverWait(driver, timeout).until(
+                    lambda d: d.find_element(By.ID, 'fps').text != 'running...')
+                line = driver.find_element(By.ID, 'fps').text
+                results[path] = float(line.rsplit(':', 1)[1].split()[0])
+            except Exception as e:
+                print(f'{path}: {type(e).__name__}: {e}')
+                results[path] = None
+            print(f'{os.path.basename(path)}: {results[path]} fps', flush=True)
+    finally:
+        driver.quit()
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    import bokeh
+    from bokeh.embed import components
+    from bokeh.resources import INLINE
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', default=os.path.join(ROOT, 'benchmarks', 'fps'))
+    parser.add_argument('--frames', type=int, default=240)
+    parser.add_argument('--sizes', default='')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--results', default=None)
+    args = parser.parse_args()
+
+    # BokehJS is inlined so the pages load the same with or without a network
+    os.makedirs(args.out, exist_ok=True)
+    pages = []
+    for name, signal in signals([int(n) for n in args.sizes.split(',') if n]):
+        for backend in ('canvas', 'webgl'):
+            plot = InteractivePlot(np.arange(len(signal)), signal, backend=backend)
+            script, div = components(plot.plot_with_zoom())
+            path = os.path.join(args.out, f'{name}_{backend}.html')
+            with open(path, 'w') as f:
+                f.write(PAGE.format(name=name, backend=backend, points=len(signal), frames=args.frames,
+                                    resources=INLINE.render(), div=div, script=script, x_range=plot.p.x_range.id))
+            pages.append((path, name, backend, len(signal)))
+            print(path)
+
+    if not args.headless:
+        return
+    fps = run_headless([page[0] for page in pages], args.timeout)
+    sha = commit()
+    out = args.results or os.path.join(ROOT, 'benchmarks', 'results', f'render_fps-{sha or "local"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(dict(commit=sha, date=datetime.datetime.now().isoformat(timespec='seconds'),
+                       python=platform.python_version(), bokeh=bokeh.__version__, frames=args.frames,
+                       results=[dict(dataset=name, backend=backend, points=points, fps=fps[path])
+                                for path, name, backend, points in pages]), f, indent=1)
+    print(out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import importlib
+
+import numpy as np
+
+from assessment import load, mass, match_patterns
+
+
+def test_match_patterns_matches_mass_serially_and_in_processes(monkeypatch):
+    signal = np.asarray(load('abp'))[:5000]
+    patterns = [signal[i:i + 100] for i in (10, 1200, 3300)]
+    expected = [mass(pattern, signal) for pattern in patterns]
+    for profile, reference in zip(match_patterns(patterns, signal), expected):
+        np.testing.assert_allclose(profile, reference)
+
+    # below the work threshold nothing is split; with it lowered the patterns
+    # go to processes reading the signal from shared memory
+    # (the package re-exports the ab_join function under the module's name)
+    monkeypatch.setattr(importlib.import_module('assessment.ab_join'), 'PARALLEL_WORK', 0)
+    for profile, reference in zip(match_patterns(patterns, signal, n_jobs=2), expected):
+        np.testing.assert_allclose(profile, reference)
@@ -0,0 +1,50 @@
+import numpy as np
+
+from assessment import QueryIndex
+from assessment.search import _znorm, dtw
+
+
+def _dtw_reference(a, b, r):
+    # the textbook O(m^2) dynamic program, restricted to the band
+    m = len(a)
+    D = np.full((m + 1, m + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(1, m + 1):
+        for j in range(max(1, i - r), min(m, i + r) + 1):
+            D[i, j] = (a[i - 1] - b[j - 1]) ** 2 + min(D[i - 1, j], D[i, j - 1], D[i - 1, j - 1])
+    return D[m, m]
+
+
+def test_dtw_matches_reference():
+    rng = np.random.default_rng(0)
+    q = rng.standard_normal(40)
+    Z = rng.standard_normal((12, 40))
+    for r in (0, 1, 4, 39, 60):
+        expected = [_dtw_reference(q, z, min(r, 39)) for z in Z]
+        np.testing.assert_allclose(dtw(Z, q, r), expected)
+
+
+def test_dtw_abandons_only_rows_past_the_threshold():
+    rng = np.random.default_rng(1)
+    q = rng.standard_normal(30)
+    Z = q + rng.standard_normal((20, 30)) * np.linspace(0.1, 2, 20)[:, None]
+    full = dtw(Z, q, 3)
+    threshold = np.median(full)
+    d = dtw(Z, q, 3, abandon=threshold)
+    np.testing.assert_allclose(d[full < threshold], full[full < threshold])
+    assert np.isinf(d[full >= threshold]).all()
+
+
+def test_dtw_search_matches_brute_force():
+    rng = np.random.default_rng(2)
+    t = np.arange(3000)
+    T = np.sin(2 * np.pi * t / 90) + 0.3 * np.sin(2 * np.pi * t / 410) + 0.1 * rng.standard_normal(len(t))
+    index = QueryIndex(T)
+    m, r, k = 48, 4, 3
+    q = T[700:700 + m] + 0.2 * rng.standard_normal(m)
+
+    idx, dist = index.search(q, k=k, metric='dtw', band=r / m)
+    Z = index._z(np.arange(len(T) - m + 1), m)
+    expected_idx, expected_dist = index._top_k(np.sqrt(dtw(Z, _znorm(q), r)), k, m // 2)
+    np.testing.assert_array_equal(idx, expected_idx)
+    np.testing.assert_allclose(dist, expected_dist)